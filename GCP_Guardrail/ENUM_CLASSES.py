@@ -1,12 +1,46 @@
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 from dataclasses import dataclass, field
 import json
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Mapping
 import os
 
+# Optional fast JSON encoder - falls back to stdlib json if not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Maps spaces and hyphens to underscores in one pass (shared by all parsers)
+_NORMALIZE_TABLE = str.maketrans({" ": "_", "-": "_"})
+
+
+class CaseInsensitiveEnum(str, Enum):
+    """
+    String enum that also resolves members by name or value, case-insensitively.
+    
+    e.g. EntityType("phone number") -> EntityType.PHONE_NUMBER. The lookup table is
+    built on first miss, per enum class. Aliases (e.g. "death") stay in parse_*.
+    """
+    
+    @classmethod
+    def _missing_(cls, value):
+        if not isinstance(value, str):
+            return None
+        lookup = cls.__dict__.get("_ci_map")
+        if lookup is None:
+            lookup = {}
+            for member in cls:
+                lookup[member.name.lower()] = member
+                lookup[member.value.lower().translate(_NORMALIZE_TABLE)] = member
+            cls._ci_map = lookup
+        return lookup.get(value.strip().lower().translate(_NORMALIZE_TABLE))
+
 
 # Defining ENUM types
-class GuardrailType(Enum):
+class GuardrailType(CaseInsensitiveEnum):
     """Available guardrail types."""
     NLP_SENTIMENT = "nlp_sentiment"
     NLP_ENTITIES = "nlp_entities"
@@ -16,7 +50,7 @@ class GuardrailType(Enum):
 
 
 # Provided by GCP Natural Language API Moderation Categories - as of January 2026
-class ModerationCategory(Enum):
+class ModerationCategory(CaseInsensitiveEnum):
     """NLP API moderation categories."""
     TOXIC = "Toxic"
     INSULT = "Insult"
@@ -37,7 +71,7 @@ class ModerationCategory(Enum):
 
 
 # Exhaustive Entity Types for GCP Natural Language API - January 2026
-class EntityType(Enum):
+class EntityType(CaseInsensitiveEnum):
     UNKNOWN = "UNKNOWN"
     PERSON = "PERSON"
     LOCATION = "LOCATION"
@@ -60,12 +94,65 @@ class EntityType(Enum):
 
 
 # User prompt for input check from user end and model response for output check from model response end
-class CheckType(Enum):
+class CheckType(CaseInsensitiveEnum):
     """Type of content check for Model Armor."""
     USER_PROMPT = "user_prompt"
     MODEL_RESPONSE = "model_response"
 
 
+# ============================================================================
+# LOOKUP TABLES (built once at import time)
+# ============================================================================
+
+# Fuzzy matching for common moderation category variations (read-only)
+_MOD_FUZZY_MAP: Mapping[str, ModerationCategory] = MappingProxyType({
+    "death": ModerationCategory.DEATH_HARM_TRAGEDY,
+    "harm": ModerationCategory.DEATH_HARM_TRAGEDY,
+    "tragedy": ModerationCategory.DEATH_HARM_TRAGEDY,
+    "death_harm_tragedy": ModerationCategory.DEATH_HARM_TRAGEDY,
+    "firearms": ModerationCategory.FIREARMS_WEAPONS,
+    "weapons": ModerationCategory.FIREARMS_WEAPONS,
+    "firearms_weapons": ModerationCategory.FIREARMS_WEAPONS,
+    "public": ModerationCategory.PUBLIC_SAFETY,
+    "safety": ModerationCategory.PUBLIC_SAFETY,
+    "public_safety": ModerationCategory.PUBLIC_SAFETY,
+    "religion": ModerationCategory.RELIGION_BELIEF,
+    "belief": ModerationCategory.RELIGION_BELIEF,
+    "religion_belief": ModerationCategory.RELIGION_BELIEF,
+    "drugs": ModerationCategory.ILLICIT_DRUGS,
+    "illicit": ModerationCategory.ILLICIT_DRUGS,
+    "illicit_drugs": ModerationCategory.ILLICIT_DRUGS,
+    "war": ModerationCategory.WAR_CONFLICT,
+    "conflict": ModerationCategory.WAR_CONFLICT,
+    "war_conflict": ModerationCategory.WAR_CONFLICT,
+})
+
+# Moderation categories keyed by lowercase name, lowercase value (e.g. "death, harm & tragedy") and fuzzy aliases
+_MOD_BY_KEY: Dict[str, ModerationCategory] = dict(_MOD_FUZZY_MAP)
+for _c in ModerationCategory:
+    _MOD_BY_KEY[_c.name.lower()] = _c
+    _MOD_BY_KEY[_c.value.lower()] = _c
+
+# Check types keyed by lowercase name, value and common aliases
+_CHECK_BY_KEY: Dict[str, CheckType] = {
+    "user": CheckType.USER_PROMPT,
+    "prompt": CheckType.USER_PROMPT,
+    "input": CheckType.USER_PROMPT,
+    "model": CheckType.MODEL_RESPONSE,
+    "response": CheckType.MODEL_RESPONSE,
+    "output": CheckType.MODEL_RESPONSE,
+}
+for _ct in CheckType:
+    _CHECK_BY_KEY[_ct.name.lower()] = _ct
+    _CHECK_BY_KEY[_ct.value.lower()] = _ct
+
+del _c, _ct
+
+# Pre-rendered "valid values" lists for parser error messages
+_ENTITY_VALID_STR = repr([e.name.lower() for e in EntityType])
+_MOD_VALID_STR = repr([c.name.lower() for c in ModerationCategory])
+
+
 # ============================================================================
 # HELPER FUNCTIONS FOR STRING TO ENUM CONVERSION (Case-insensitive)
 # ============================================================================
@@ -74,128 +161,142 @@ def parse_entity_type(value: Union[str, EntityType]) -> EntityType:
     """Convert string to EntityType (case-insensitive)."""
     if isinstance(value, EntityType):
         return value
-    
+    return _parse_entity_type_str(value)
+
+
+@lru_cache(maxsize=256)
+def _parse_entity_type_str(value: str) -> EntityType:
+    """Cached string -> EntityType lookup. Config strings repeat across requests."""
     # Normalize: remove spaces, underscores variations, uppercase
-    normalized = value.strip().upper().replace(" ", "_").replace("-", "_")
-    
-    # Try direct match by name
-    for entity in EntityType:
-        if entity.name == normalized or entity.value == normalized:
-            return entity
+    normalized = value.strip().upper().translate(_NORMALIZE_TABLE)
     
-    raise ValueError(f"Unknown entity type: '{value}'. Valid types: {[e.name.lower() for e in EntityType]}")
+    # Entity names and values are both uppercase, so the enum's own maps are enough
+    entity = EntityType.__members__.get(normalized) or EntityType._value2member_map_.get(normalized)
+    if entity is None:
+        raise ValueError(f"Unknown entity type: '{value}'. Valid types: {_ENTITY_VALID_STR}")
+    return entity
 
 
 def parse_moderation_category(value: Union[str, ModerationCategory]) -> ModerationCategory:
     """Convert string to ModerationCategory (case-insensitive)."""
     if isinstance(value, ModerationCategory):
         return value
-    
+    return _parse_moderation_category_str(value)
+
+
+@lru_cache(maxsize=256)
+def _parse_moderation_category_str(value: str) -> ModerationCategory:
+    """Cached string -> ModerationCategory lookup."""
     normalized = value.strip().lower()
     
-    # Try matching by name (e.g., "toxic", "TOXIC")
-    for cat in ModerationCategory:
-        if cat.name.lower() == normalized:
-            return cat
-        # Also match by value (e.g., "Death, Harm & Tragedy")
-        if cat.value.lower() == normalized:
-            return cat
-    
-    # Fuzzy matching for common variations
-    fuzzy_map = {
-        "death": ModerationCategory.DEATH_HARM_TRAGEDY,
-        "harm": ModerationCategory.DEATH_HARM_TRAGEDY,
-        "tragedy": ModerationCategory.DEATH_HARM_TRAGEDY,
-        "death_harm_tragedy": ModerationCategory.DEATH_HARM_TRAGEDY,
-        "firearms": ModerationCategory.FIREARMS_WEAPONS,
-        "weapons": ModerationCategory.FIREARMS_WEAPONS,
-        "firearms_weapons": ModerationCategory.FIREARMS_WEAPONS,
-        "public": ModerationCategory.PUBLIC_SAFETY,
-        "safety": ModerationCategory.PUBLIC_SAFETY,
-        "public_safety": ModerationCategory.PUBLIC_SAFETY,
-        "religion": ModerationCategory.RELIGION_BELIEF,
-        "belief": ModerationCategory.RELIGION_BELIEF,
-        "religion_belief": ModerationCategory.RELIGION_BELIEF,
-        "drugs": ModerationCategory.ILLICIT_DRUGS,
-        "illicit": ModerationCategory.ILLICIT_DRUGS,
-        "illicit_drugs": ModerationCategory.ILLICIT_DRUGS,
-        "war": ModerationCategory.WAR_CONFLICT,
-        "conflict": ModerationCategory.WAR_CONFLICT,
-        "war_conflict": ModerationCategory.WAR_CONFLICT,
-    }
-    
-    normalized_underscore = normalized.replace(" ", "_").replace("-", "_")
-    if normalized_underscore in fuzzy_map:
-        return fuzzy_map[normalized_underscore]
-    
-    raise ValueError(f"Unknown moderation category: '{value}'. Valid categories: {[c.name.lower() for c in ModerationCategory]}")
+    # Match by name (e.g., "toxic"), value (e.g., "Death, Harm & Tragedy") or fuzzy alias
+    cat = _MOD_BY_KEY.get(normalized)
+    if cat is None:
+        cat = _MOD_BY_KEY.get(normalized.translate(_NORMALIZE_TABLE))
+    if cat is None:
+        raise ValueError(f"Unknown moderation category: '{value}'. Valid categories: {_MOD_VALID_STR}")
+    return cat
 
 
 def parse_check_type(value: Union[str, CheckType]) -> CheckType:
     """Convert string to CheckType (case-insensitive)."""
     if isinstance(value, CheckType):
         return value
+    return _parse_check_type_str(value)
+
+
+@lru_cache(maxsize=256)
+def _parse_check_type_str(value: str) -> CheckType:
+    """Cached string -> CheckType lookup."""
+    normalized = value.strip().lower().translate(_NORMALIZE_TABLE)
     
-    normalized = value.strip().lower().replace(" ", "_").replace("-", "_")
-    
-    for ct in CheckType:
-        if ct.name.lower() == normalized or ct.value.lower() == normalized:
-            return ct
-    
-    # Common aliases
-    if normalized in ["user", "prompt", "input"]:
-        return CheckType.USER_PROMPT
-    if normalized in ["model", "response", "output"]:
-        return CheckType.MODEL_RESPONSE
-    
-    raise ValueError(f"Unknown check type: '{value}'. Valid types: 'user_prompt', 'model_response'")
+    check_type = _CHECK_BY_KEY.get(normalized)
+    if check_type is None:
+        raise ValueError(f"Unknown check type: '{value}'. Valid types: 'user_prompt', 'model_response'")
+    return check_type
 
 
 def parse_entity_types(values: Optional[List[Union[str, EntityType]]]) -> Optional[List[EntityType]]:
     """Convert list of strings/EntityTypes to list of EntityType."""
     if values is None:
         return None
-    return [parse_entity_type(v) for v in values]
+    # Already parsed (e.g. from normalize_guardrail_config): plain copy
+    if all(isinstance(v, EntityType) for v in values):
+        return list(values)
+    return [v if isinstance(v, EntityType) else _parse_entity_type_str(v) for v in values]
 
 
 def parse_moderation_categories(values: Optional[List[Union[str, ModerationCategory]]]) -> Optional[List[ModerationCategory]]:
     """Convert list of strings/ModerationCategories to list of ModerationCategory."""
     if values is None:
         return None
-    return [parse_moderation_category(v) for v in values]
+    if all(isinstance(v, ModerationCategory) for v in values):
+        return list(values)
+    return [v if isinstance(v, ModerationCategory) else _parse_moderation_category_str(v) for v in values]
 
 
 def parse_moderation_thresholds(thresholds: Optional[Dict[Union[str, ModerationCategory], float]]) -> Optional[Dict[ModerationCategory, float]]:
     """Convert dict with string keys to dict with ModerationCategory keys."""
     if thresholds is None:
         return None
-    return {parse_moderation_category(k): v for k, v in thresholds.items()}
+    # Already keyed by enums: copy as-is without re-parsing each key
+    if all(isinstance(k, ModerationCategory) for k in thresholds):
+        return dict(thresholds)
+    return {
+        k if isinstance(k, ModerationCategory) else _parse_moderation_category_str(k): v
+        for k, v in thresholds.items()
+    }
 
 
 # ============================================================================
 # RESPONSE STRUCTURE
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class GuardrailResult:
-    """Unified response structure for all guardrail checks."""
+    """
+    Unified response structure for all guardrail checks.
+    
+    to_dict() / to_json() output is computed once and cached, so do not mutate
+    results or blocked_items after the first serialization.
+    """
     guardrail_type: str
     results: Dict[str, Any] = field(default_factory=dict)
     blocked_items: List[Dict[str, Any]] = field(default_factory=list)
     error: Optional[str] = None
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _json_cache: Dict[int, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _bytes_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
+        if self._dict_cache is not None:
+            return self._dict_cache
+        # Only include blocked_items / error if there are any
         output = {
             "guardrail_type": self.guardrail_type,
             "results": self.results,
+            **({"blocked_items": self.blocked_items} if self.blocked_items else {}),
+            **({"error": self.error} if self.error else {}),
         }
-        # Only include blocked_items if there are any
-        if self.blocked_items:
-            output["blocked_items"] = self.blocked_items
-        # Only include error if present
-        if self.error:
-            output["error"] = self.error
+        self._dict_cache = output
         return output
     
     def to_json(self, indent: int = 2) -> str:
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
\ No newline at end of file
+        cached = self._json_cache.get(indent)
+        if cached is None:
+            # orjson only supports 2-space indentation; anything else goes through stdlib json
+            if orjson is not None and indent == 2:
+                cached = self.to_bytes().decode()
+            else:
+                cached = json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+            self._json_cache[indent] = cached
+        return cached
+    
+    def to_bytes(self) -> bytes:
+        """UTF-8 encoded JSON (2-space indent) for HTTP bodies and files - skips the str round-trip."""
+        if self._bytes_cache is None:
+            if orjson is not None:
+                self._bytes_cache = orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2)
+            else:
+                self._bytes_cache = self.to_json().encode("utf-8")
+        return self._bytes_cache
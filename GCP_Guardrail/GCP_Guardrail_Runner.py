@@ -7,21 +7,53 @@ Setup:
     1. Place your service account JSON in: secrets/guardrail_secret.json
     2. Create a .env file with: LOCATION, PROJECT_ID, TEMPLATE_ID
     3. Create a config.json file to define which functions to run
+
+Run time is dominated by waiting on remote NLP API / Model Armor calls, so the
+runner overlaps them (shared thread pools, concurrent phases) and keeps
+per-request CPU work - config parsing, logging - off the hot path.
 """
 
 import os
 import json
+import asyncio
+import hashlib
 import time
 import re
+import queue
+import threading
+import weakref
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional fast JSON for config and log I/O - falls back to stdlib json if not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: Hyperscan (preferred) or google-re2 prefilters PII patterns in a single linear scan
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 from dotenv import load_dotenv
 load_dotenv()
 
 from Gemini_Guardrail import GeminiGuardrail
-from ENUM_CLASSES import GuardrailType, CheckType
+from NLP_CLIENT import category_matcher
+from ENUM_CLASSES import (
+    GuardrailType, CheckType, EntityType, ModerationCategory,
+    parse_entity_types, parse_moderation_categories, parse_moderation_thresholds
+)
 
 
 # Valid NLP API entity types
@@ -53,18 +85,182 @@ PII_PATTERNS = {
     ],
 }
 
+# PII_PATTERNS compiled once at import. Patterns stay separate (not one alternation)
+# because overlapping matches of different types must all be reported.
+COMPILED_PII_PATTERNS = {
+    pii_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for pii_type, patterns in PII_PATTERNS.items()
+}
+
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Compact UTF-8 encoded JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes. orjson's JSONDecodeError subclasses json.JSONDecodeError."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _elapsed_seconds(start_ns: int) -> float:
+    """Seconds since a time.perf_counter_ns() reading, rounded for output."""
+    return round((time.perf_counter_ns() - start_ns) / 1e9, 4)
+
+
+def _stamp_log_line(ts_ns: int, body: bytes) -> bytes:
+    """Prefix a serialized log entry (JSON object bytes) with its query_timestamp."""
+    timestamp = datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+    return b'{"query_timestamp":"' + timestamp.encode() + b'",' + body[1:]
+
+
+# Python's \s on ASCII text, spelled out: RE2's \s lacks \v and \x1c-\x1f, Hyperscan's lacks \x1c-\x1f
+_ASCII_WHITESPACE = r"\t\n\x0b\f\r\x1c-\x1f "
+
+
+def _prefilter_pattern(pattern: str) -> str:
+    r"""pattern with every \s replaced by _ASCII_WHITESPACE, so the prefilter never misses a re match."""
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            escape = pattern[i:i + 2]
+            if escape == r"\s":
+                out.append(_ASCII_WHITESPACE if in_class else f"[{_ASCII_WHITESPACE}]")
+            else:
+                out.append(escape)
+            i += 2
+            continue
+        if pattern[i] == "[":
+            in_class = True
+        elif pattern[i] == "]":
+            in_class = False
+        out.append(pattern[i])
+        i += 1
+    return "".join(out)
+
+
+def _build_pii_prefilter():
+    """Compile all PII patterns into one RE2 set. Returns (set, [(pii_type, index)]) or None."""
+    if re2 is None:
+        return None
+    try:
+        options = re2.Options()
+        options.case_sensitive = False
+        pii_set = re2.Set.SearchSet(options)
+        pattern_ids = []
+        for pii_type, patterns in PII_PATTERNS.items():
+            for index, pattern in enumerate(patterns):
+                pii_set.Add(_prefilter_pattern(pattern))
+                pattern_ids.append((pii_type, index))
+        pii_set.Compile()
+        return pii_set, pattern_ids
+    except Exception:
+        return None
+
+
+def _build_pii_hyperscan():
+    """Compile all PII patterns into one Hyperscan database. Returns (db, [(pii_type, index)]) or None."""
+    if hyperscan is None:
+        return None
+    try:
+        pattern_ids = []
+        expressions = []
+        for pii_type, patterns in PII_PATTERNS.items():
+            for index, pattern in enumerate(patterns):
+                expressions.append(_prefilter_pattern(pattern).encode())
+                pattern_ids.append((pii_type, index))
+        # SINGLEMATCH: only whether a pattern hits matters, not every match position
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        db = hyperscan.Database()
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions),
+        )
+        return db, pattern_ids
+    except Exception:
+        return None
+
+
+PII_HYPERSCAN = _build_pii_hyperscan()
+PII_PREFILTER = None if PII_HYPERSCAN is not None else _build_pii_prefilter()
+
+# Hyperscan scratch space must not be shared between concurrently scanning threads
+_hyperscan_local = threading.local()
+
+
+def _pii_hyperscan_hits(text: str) -> Optional[set]:
+    """One Hyperscan pass over text; None if the scan fails."""
+    db, pattern_ids = PII_HYPERSCAN
+    scratch = getattr(_hyperscan_local, "scratch", None)
+    if scratch is None:
+        scratch = _hyperscan_local.scratch = hyperscan.Scratch(db)
+    
+    hits = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        hits.add(pattern_ids[pattern_id])
+    
+    try:
+        db.scan(text.encode(), match_event_handler=on_match, scratch=scratch)
+    except Exception:
+        return None
+    return hits
+
+
+def _pii_pattern_hits(text: str) -> Optional[set]:
+    """
+    (pii_type, index) of every PII pattern that matches somewhere in text, via one
+    Hyperscan or RE2 pass. The matches themselves are still extracted with Python's re.
+    None means "no prefilter - scan every pattern": neither library is available, or the
+    text is non-ASCII (their digit and word-boundary classes are ASCII-only, Python's re
+    is Unicode-aware).
+    """
+    if not text.isascii():
+        return None
+    if PII_HYPERSCAN is not None:
+        return _pii_hyperscan_hits(text)
+    if PII_PREFILTER is None:
+        return None
+    pii_set, pattern_ids = PII_PREFILTER
+    # google-re2's Set.Match returns None rather than [] when nothing matches
+    return {pattern_ids[i] for i in pii_set.Match(text) or ()}
+
 
 
 BASE_DIR = os.path.dirname(__file__)
 SECRETS_PATH = os.path.join(BASE_DIR, "secrets", "guardrail_secret.json")
 LOG_DIR = os.path.join(BASE_DIR, "gcp_guardrail_log")
 
+# Log entries are written by a background thread in batches of up to
+# LOG_BATCH_MAX_ENTRIES / LOG_BATCH_MAX_BYTES, or whatever arrived within LOG_BATCH_WAIT_SECONDS
+LOG_QUEUE_MAX_ENTRIES = 10_000
+LOG_BATCH_MAX_ENTRIES = 64
+LOG_BATCH_MAX_BYTES = 64 * 1024
+LOG_BATCH_WAIT_SECONDS = 0.05
+
 # Default values if .env is not configured
 DEFAULT_LOCATION = "us-central1"
 DEFAULT_PROJECT_ID = "ai-experiments-345006"
 DEFAULT_TEMPLATE_ID = "litellm-gcp-guard"
 
 
+# Config key normalization: spaces/hyphens -> underscores in one pass
+_KEY_NORMALIZE_TABLE = str.maketrans({" ": "_", "-": "_"})
+
+
+# Worker threads shared by all parallel phases of a runner (I/O-bound GCP calls)
+EXECUTOR_MAX_WORKERS = max(8, 2 * len(GuardrailType))
+
+
 # Function name to GuardrailType mapping
 FUNCTION_MAP = {
     "sentiment": GuardrailType.NLP_SENTIMENT,
@@ -90,6 +286,247 @@ DISPLAY_NAMES = {
 
 
 
+def _split_repeats(pairs: List[tuple]) -> Tuple[List[int], List[int]]:
+    """Indexes of the first occurrence of each distinct pair, and of every later repeat."""
+    seen = set()
+    firsts, repeats = [], []
+    for i, pair in enumerate(pairs):
+        if pair in seen:
+            repeats.append(i)
+        else:
+            seen.add(pair)
+            firsts.append(i)
+    return firsts, repeats
+
+
+@dataclass(frozen=True)
+class PhaseSettings:
+    """
+    One phase's config section plus its blocking settings, parsed and case-normalized once.
+    
+    The request path hands the parsed enums straight to GeminiGuardrail and the
+    blocking checks read these prepared sets/dicts instead of re-deriving them
+    from config strings on every call. The loaded config dict itself is left as-is.
+    """
+    config: Dict[str, Any]
+    # Entity types / per-type salience thresholds, upper-cased for the blocking checks
+    blocked_types_upper: FrozenSet[str]
+    salience_thresholds: Dict[str, float]
+    # Classification patterns lower-cased, and one alternation over them (None if no patterns)
+    classification_blocked_lower: Tuple[str, ...]
+    classification_blocked_re: Optional[re.Pattern]
+    # Moderation categories lower-cased; None means "block every category returned by the API"
+    moderation_blocked_lower: Optional[FrozenSet[str]]
+    moderation_thresholds_lower: Dict[str, float]
+    # Parsed enums for the GeminiGuardrail calls; regex-only entity types (SSN, CREDIT_CARD) left out
+    nlp_entity_types: Optional[List[EntityType]]
+    moderation_categories: Optional[List[ModerationCategory]]
+    moderation_thresholds: Optional[Dict[ModerationCategory, float]]
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """A raw setting from the phase's config section."""
+        return self.config.get(key, default)
+
+
+def normalize_phase_config(phase_config: PhaseSettings) -> PhaseSettings:
+    """Build the PhaseSettings for one phase's config section. Raises ValueError for unknown names."""
+    blocked_types = phase_config.get("analyze_entities_blocked_types") or []
+    salience_thresholds = phase_config.get("analyze_entities_salience_thresholds") or {}
+    classification_blocked = tuple(phase_config.get("classify_text_blocked_categories") or ())
+    # Same (lowered patterns, alternation) matcher NLPClient.classify_text uses
+    classification_lower, classification_re = (
+        category_matcher(classification_blocked) if classification_blocked else ((), None)
+    )
+    moderation_blocked = phase_config.get("moderate_text_blocked_categories")
+    
+    return PhaseSettings(
+        config=phase_config,
+        blocked_types_upper=frozenset(t.translate(_KEY_NORMALIZE_TABLE).upper() for t in blocked_types),
+        salience_thresholds={
+            k.translate(_KEY_NORMALIZE_TABLE).upper(): v for k, v in salience_thresholds.items()
+        },
+        classification_blocked_lower=classification_lower,
+        classification_blocked_re=classification_re,
+        moderation_blocked_lower=(
+            None if moderation_blocked is None else frozenset(c.lower() for c in moderation_blocked)
+        ),
+        moderation_thresholds_lower={
+            k.lower(): v for k, v in (phase_config.get("moderate_text_thresholds") or {}).items()
+        },
+        nlp_entity_types=parse_entity_types(
+            [t for t in blocked_types if t.upper() in NLP_API_ENTITY_TYPES]
+        ),
+        moderation_categories=parse_moderation_categories(moderation_blocked),
+        moderation_thresholds=parse_moderation_thresholds(phase_config.get("moderate_text_thresholds")),
+    )
+
+
+def normalize_guardrail_config(config: Dict[str, Any]) -> Dict[str, PhaseSettings]:
+    """PhaseSettings for the "input" / "output" sections of config, keyed by phase name."""
+    settings = {}
+    for phase in ("input", "output"):
+        phase_config = config.get(phase)
+        if not isinstance(phase_config, dict):
+            continue
+        try:
+            settings[phase] = normalize_phase_config(phase_config)
+        except ValueError as e:
+            raise ValueError(f"Invalid '{phase}' config: {e}")
+    return settings
+
+
+
+def _close_runner_resources(executors: Tuple[ThreadPoolExecutor, ...], log_writer: Optional["_LogWriter"],
+                            wait: bool = False) -> None:
+    """
+    A runner's cleanup; takes the resources rather than the runner so its finalizer doesn't keep it alive.
+    Only an explicit close() waits for the pools: garbage collection can run the finalizer on one of
+    their own threads (the last reference dropped inside a task), which cannot join itself.
+    """
+    try:
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+    finally:
+        if log_writer is not None:
+            log_writer.close()
+
+
+class _LogWriter:
+    """
+    Background writer for one runner's log file: entries are queued by the request
+    thread and appended in batches by a daemon thread. Holds no reference to the
+    runner, so an unclosed runner can still be garbage-collected (its finalizer
+    then closes the writer).
+    """
+    
+    def __init__(self, user_name: str):
+        self._user_name = user_name
+        
+        # Create log directory if it doesn't exist
+        os.makedirs(LOG_DIR, exist_ok=True)
+        
+        # Log file name: {user_name}_{YYYY-MM-DD}.jsonl (one JSON entry per line), re-dated on write
+        self._date: Optional[str] = None
+        self.file_path: Optional[str] = None
+        self._update_file_path()
+        
+        # Taken around every enqueue and by close(), so nothing is queued after the stop sentinel
+        self._lock = threading.Lock()
+        # Entries discarded because the queue was full, and how many of those were already reported
+        self._dropped = 0
+        self._dropped_reported = 0
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_MAX_ENTRIES)
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._worker, name="guardrail-log-writer", daemon=True
+        )
+        self._thread.start()
+    
+    def put(self, line: Tuple[int, bytes]) -> None:
+        """Queue a (time_ns, JSON bytes) entry; once closed, write it synchronously instead."""
+        with self._lock:
+            closed = self._thread is None
+            while not closed:
+                try:
+                    self._queue.put_nowait(line)
+                    break
+                except queue.Full:
+                    # Drop the oldest entry rather than block the request; the writer reports the count
+                    try:
+                        self._queue.get_nowait()
+                        self._queue.task_done()
+                        self._dropped += 1
+                    except queue.Empty:
+                        pass
+        
+        if closed:
+            self._write_lines([_stamp_log_line(*line)])
+    
+    def flush(self) -> None:
+        """Wait until every queued entry is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def close(self) -> None:
+        """Flush pending entries and stop the writer thread. Safe to call twice."""
+        # Once _thread is None no producer enqueues, so the sentinel is the last entry queued
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        # Closed from the writer thread itself (a finalizer run by GC there): it exits after the sentinel
+        if thread is threading.current_thread():
+            return
+        thread.join()
+        self._report_dropped()
+    
+    def _worker(self) -> None:
+        """Background thread: drain the log queue and append entries in batches."""
+        while True:
+            line = self._queue.get()
+            if line is None:
+                self._queue.task_done()
+                return
+            
+            # Collect a batch: up to LOG_BATCH_MAX_ENTRIES, LOG_BATCH_MAX_BYTES or LOG_BATCH_WAIT_SECONDS
+            batch = [line]
+            batch_bytes = len(line[1])
+            stop = False
+            deadline = time.monotonic() + LOG_BATCH_WAIT_SECONDS
+            while len(batch) < LOG_BATCH_MAX_ENTRIES and batch_bytes < LOG_BATCH_MAX_BYTES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    line = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if line is None:
+                    stop = True
+                    break
+                batch.append(line)
+                batch_bytes += len(line[1])
+            
+            self._write_lines([_stamp_log_line(ts_ns, body) for ts_ns, body in batch])
+            self._report_dropped()
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+    
+    def _report_dropped(self) -> None:
+        """Warn about log entries dropped from a full queue since the last report."""
+        with self._lock:
+            dropped = self._dropped - self._dropped_reported
+            self._dropped_reported = self._dropped
+        if dropped:
+            print(f"⚠️  Log queue full: dropped {dropped} log entries ({self._dropped} in total)")
+    
+    def _update_file_path(self) -> None:
+        """Point the log file at today's date so long-running processes roll over at midnight."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        if today != self._date:
+            self._date = today
+            self.file_path = os.path.join(LOG_DIR, f"{self._user_name}_{today}.jsonl")
+    
+    def _write_lines(self, lines: List[bytes]) -> None:
+        """Append JSON lines to the log file in a single write."""
+        self._update_file_path()
+        data = b"\n".join(lines) + b"\n"
+        try:
+            try:
+                with open(self.file_path, 'ab') as f:
+                    f.write(data)
+            except FileNotFoundError:
+                # Log directory was removed while running
+                os.makedirs(LOG_DIR, exist_ok=True)
+                with open(self.file_path, 'ab') as f:
+                    f.write(data)
+        except IOError as e:
+            print(f"⚠️  Failed to write log: {e}")
+
 
 
 class GuardrailRunner:
@@ -101,10 +538,11 @@ class GuardrailRunner:
         - secrets/guardrail_secret.json for GCP credentials
         - config.json for function settings
     
-    Logs all queries and results to: gcp_guardrail_log/{user_name}_{date}.json
+    Logs all queries and results to: gcp_guardrail_log/{user_name}_{date}.jsonl
     """
     
-    def __init__(self, config_path, user_name: str = "simpplr_user", enable_logging: bool = True):
+    def __init__(self, config_path, user_name: str = "simpplr_user", enable_logging: bool = True,
+                 include_text_in_result: bool = False, log_full_text: bool = True):
         """
         Initialize the GuardrailRunner.
         
@@ -112,17 +550,49 @@ class GuardrailRunner:
             config_path: Path to config.json file. 
             user_name: Name to identify the user in log files.
             enable_logging: Whether to enable logging (default: True).
+            include_text_in_result: Default for run(include_text=...) (default: False).
+            log_full_text: Log the input text itself; if False only a blake2b digest and
+                           its length are logged (default: True).
         """
         self._config_path = config_path
         self._user_name = user_name
         self._enable_logging = enable_logging
+        self._include_text_in_result = include_text_in_result
+        self._log_full_text = log_full_text
         self._guardrail: Optional[GeminiGuardrail] = None
         self._config: Dict[str, Any] = {}
+        self._phase_settings: Dict[str, PhaseSettings] = {}
+        
+        # GuardrailType -> handler returning (results, blocked_items, error)
+        self._dispatch = {
+            GuardrailType.NLP_SENTIMENT: self._run_sentiment,
+            GuardrailType.NLP_ENTITIES: self._run_entities,
+            GuardrailType.NLP_CLASSIFY: self._run_classification,
+            GuardrailType.NLP_MODERATE: self._run_moderation,
+            GuardrailType.MODEL_ARMOR: self._run_model_armor,
+        }
+        
+        # One pool for the runner's lifetime instead of one per parallel phase
+        self._executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="guardrail")
+        # Separate pool for whole phases: a phase waits on function tasks, so sharing
+        # self._executor could deadlock once every worker is a waiting phase
+        self._phase_executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="guardrail-phase")
+        # And one for whole run() calls submitted by run_batch()
+        self._batch_executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="guardrail-batch")
         
         self._validate_setup()
         self._load_config()
         self._initialize_guardrail()
-        self._setup_logging()
+        
+        # Log writes happen off the request thread
+        self._log_writer = _LogWriter(user_name) if enable_logging else None
+        
+        # Shuts the pools and log writer down on garbage collection or at interpreter exit unless
+        # close() did it first - without keeping the runner itself alive
+        self._finalizer = weakref.finalize(
+            self, _close_runner_resources,
+            (self._batch_executor, self._phase_executor, self._executor), self._log_writer
+        )
 
     
     def _validate_setup(self) -> None:
@@ -170,64 +640,47 @@ class GuardrailRunner:
 
 
     
-    def _setup_logging(self) -> None:
-        """Setup logging directory and file."""
-        if not self._enable_logging:
-            self._log_file_path = None
-            return
-        
-        # Create log directory if it doesn't exist
-        if not os.path.exists(LOG_DIR):
-            os.makedirs(LOG_DIR)
-        
-        # Create log file name: {user_name}_{YYYY-MM-DD}.json
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_filename = f"{self._user_name}_{today}.json"
-        self._log_file_path = os.path.join(LOG_DIR, log_filename)
-    
-
-
     def _log_query(self, input_text: str, output_result: Dict[str, Any]) -> None:
-        """Log a query with timestamp, input, and output."""
-        if not self._enable_logging or not self._log_file_path:
+        """Queue a log entry with timestamp, input, and output for the background writer."""
+        if self._log_writer is None:
             return
         
-        # Create log entry
-        log_entry = {
-            "query_timestamp": datetime.now().isoformat(),
-            "user_name": self._user_name,
-            "input_text": input_text,
-            "output_result": output_result
-        }
-        
-        # Read existing logs or create new list
-        logs = []
-        if os.path.exists(self._log_file_path):
-            try:
-                with open(self._log_file_path, 'r') as f:
-                    logs = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                logs = []
-        
-        # Append new entry
-        logs.append(log_entry)
+        # Create log entry - serialized here so later mutation of output_result can't race the writer.
+        # The timestamp is captured as an int and formatted to ISO by the writer thread.
+        ts_ns = time.time_ns()
+        if self._log_full_text:
+            log_entry = {
+                "user_name": self._user_name,
+                "input_text": input_text,
+                "output_result": output_result
+            }
+        else:
+            input_text = input_text or ""
+            if "text" in output_result:
+                output_result = {k: v for k, v in output_result.items() if k != "text"}
+            log_entry = {
+                "user_name": self._user_name,
+                "input_text_hash": hashlib.blake2b(input_text.encode(), digest_size=8).hexdigest(),
+                "input_text_length": len(input_text),
+                "output_result": output_result
+            }
+        line = (ts_ns, _json_dumps(log_entry))
         
-        # Write back to file
-        try:
-            with open(self._log_file_path, 'w') as f:
-                json.dump(logs, indent=2, fp=f, ensure_ascii=False)
-        except IOError as e:
-            print(f"⚠️  Failed to write log: {e}")
+        self._log_writer.put(line)
 
 
     
     def _load_config(self) -> None:
         """Load configuration from JSON file."""
         try:
-            with open(self._config_path, 'r') as f:
-                self._config = json.load(f)
+            with open(self._config_path, 'rb') as f:
+                config = _json_loads(f.read())
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in config file: {e}")
+        
+        # Parse category/entity names once here rather than on every request
+        self._phase_settings = normalize_guardrail_config(config)
+        self._config = config
 
 
     
@@ -270,7 +723,7 @@ class GuardrailRunner:
 
 
     
-    def _check_sentiment_blocking(self, result: Dict[str, Any], phase_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _check_sentiment_blocking(self, result: Dict[str, Any], phase_config: PhaseSettings) -> Optional[Dict[str, Any]]:
         """Check if sentiment should be blocked based on config.
         
         Default behavior: blocking is ENABLED with threshold of -0.50
@@ -313,25 +766,17 @@ class GuardrailRunner:
 
 
     
-    def _check_entity_blocking(self, entities: List[Dict], phase_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _check_entity_blocking(self, entities: List[Dict], phase_config: PhaseSettings) -> List[Dict[str, Any]]:
         """Check which entities should be blocked based on config."""
-        blocked_types = phase_config.get("analyze_entities_blocked_types")
+        # Blocked types and per-entity-type thresholds are normalized once at config load
+        blocked_types_upper = phase_config.blocked_types_upper
+        normalized_thresholds = phase_config.salience_thresholds
         default_salience_threshold = phase_config.get("analyze_entities_salience_threshold", 0.0)
         
-        # Per-entity-type thresholds (optional)
-        salience_thresholds = phase_config.get("analyze_entities_salience_thresholds", {})
-        # Normalize threshold keys to uppercase
-        normalized_thresholds = {k.upper().replace(" ", "_").replace("-", "_"): v for k, v in salience_thresholds.items()}
-        
-        if not blocked_types:
+        if not blocked_types_upper:
             return []
         
-        # Normalize blocked types to uppercase
-        blocked_types_upper = [t.upper().replace(" ", "_").replace("-", "_") for t in blocked_types]
-        
         blocked = []
-        blocked_names = set()  # Track already blocked items to avoid duplicates
-        
         for entity in entities:
             entity_type = entity.get("type", "").upper()
             salience = entity.get("salience", 0)
@@ -350,38 +795,40 @@ class GuardrailRunner:
                         "threshold": threshold,
                         "detection_method": "nlp_api"
                     })
-                    blocked_names.add(entity_name)
         
         return blocked
     
     
-    def _check_pii_with_regex(self, text: str, phase_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _check_pii_with_regex(text: str, phase_config: PhaseSettings) -> List[Dict[str, Any]]:
         """
         Check for PII patterns using regex (fallback for NLP API misses).
         This catches phone numbers, emails, SSNs, etc. that NLP API might miss.
         """
-        blocked_types = phase_config.get("analyze_entities_blocked_types")
+        blocked_types_upper = phase_config.blocked_types_upper
+        normalized_thresholds = phase_config.salience_thresholds
         default_salience_threshold = phase_config.get("analyze_entities_salience_threshold", 0.0)
-        salience_thresholds = phase_config.get("analyze_entities_salience_thresholds", {})
-        normalized_thresholds = {k.upper().replace(" ", "_").replace("-", "_"): v for k, v in salience_thresholds.items()}
         
-        if not blocked_types:
+        if not blocked_types_upper:
             return []
         
-        blocked_types_upper = [t.upper().replace(" ", "_").replace("-", "_") for t in blocked_types]
-        
         blocked = []
         found_items = set()  # Avoid duplicates
         
-        for pii_type, patterns in PII_PATTERNS.items():
+        # Patterns the RE2 prefilter says can match (None = check all)
+        hits = _pii_pattern_hits(text)
+        
+        for pii_type, patterns in COMPILED_PII_PATTERNS.items():
             if pii_type not in blocked_types_upper:
                 continue
             
             # Regex detection has high confidence (salience = 1.0)
             threshold = normalized_thresholds.get(pii_type, default_salience_threshold)
             
-            for pattern in patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
+            for index, pattern in enumerate(patterns):
+                if hits is not None and (pii_type, index) not in hits:
+                    continue
+                matches = pattern.findall(text)
                 for match in matches:
                     if match not in found_items:
                         found_items.add(match)
@@ -399,23 +846,28 @@ class GuardrailRunner:
 
 
     
-    def _check_classification_blocking(self, categories: List[Dict], phase_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _check_classification_blocking(self, categories: List[Dict], phase_config: PhaseSettings) -> List[Dict[str, Any]]:
         """Check which classifications should be blocked."""
-        blocked_cats = phase_config.get("classify_text_blocked_categories")
+        blocked_lower = phase_config.classification_blocked_lower
+        blocked_re = phase_config.classification_blocked_re
         threshold = phase_config.get("classify_text_threshold", 0.5)
         
-        if not blocked_cats:
+        if not blocked_lower:
             return []
         
-        blocked_lower = [c.lower() for c in blocked_cats]
-        
         blocked = []
         for cat in categories:
             cat_name = cat.get("category", "")
             confidence = cat.get("confidence", 0)
+            if confidence < threshold:
+                continue
+            cat_lower = cat_name.lower()
+            if blocked_re is not None and not blocked_re.search(cat_lower):
+                continue
             
+            # Report the first configured pattern that matches, as before
             for pattern in blocked_lower:
-                if pattern in cat_name.lower() and confidence >= threshold:
+                if pattern in cat_lower:
                     blocked.append({
                         "category": cat_name,
                         "confidence": confidence,
@@ -430,25 +882,13 @@ class GuardrailRunner:
 
 
     
-    def _check_moderation_blocking(self, moderation: List[Dict], phase_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _check_moderation_blocking(self, moderation: List[Dict], phase_config: PhaseSettings) -> List[Dict[str, Any]]:
         """Check which moderation categories should be blocked."""
-        blocked_cats = phase_config.get("moderate_text_blocked_categories")
-        thresholds = phase_config.get("moderate_text_thresholds", {})
+        # None: no blocked categories specified, block all with default threshold
+        blocked_lower = phase_config.moderation_blocked_lower
+        normalized_thresholds = phase_config.moderation_thresholds_lower
         default_threshold = 0.5
         
-        # If no blocked categories specified, block all with default threshold
-        if blocked_cats is None:
-            blocked_cats = [m.get("category") for m in moderation]
-        
-        # Normalize to lowercase for matching
-        blocked_lower = {c.lower(): c for c in blocked_cats} if blocked_cats else {}
-        
-        # Normalize thresholds keys
-        normalized_thresholds = {}
-        if thresholds:
-            for k, v in thresholds.items():
-                normalized_thresholds[k.lower()] = v
-        
         blocked = []
         for mod in moderation:
             cat_name = mod.get("category", "")
@@ -457,7 +897,7 @@ class GuardrailRunner:
             
             # Check if this category should be blocked
             cat_lower = cat_name.lower()
-            if cat_lower in blocked_lower or cat_name in blocked_cats:
+            if blocked_lower is None or cat_lower in blocked_lower:
                 threshold = normalized_thresholds.get(cat_lower, default_threshold)
                 
                 if confidence >= threshold:
@@ -475,220 +915,171 @@ class GuardrailRunner:
 
 
     
+    def _run_sentiment(self, text: str, phase_config: PhaseSettings,
+                       check_type: CheckType) -> Tuple[Dict[str, Any], Optional[List[Dict]], Optional[str]]:
+        """Sentiment check with negative-score blocking."""
+        result = self._guardrail.check_sentiment(text)
+        blocked = self._check_sentiment_blocking(result.results, phase_config)
+        return result.results, [blocked] if blocked else None, result.error
+    
+    def _run_entities(self, text: str, phase_config: PhaseSettings,
+                      check_type: CheckType) -> Tuple[Dict[str, Any], Optional[List[Dict]], Optional[str]]:
+        """Entity check combining NLP API detection with regex PII fallback."""
+        # Nothing to block: skip the NLP call, entity filtering and the regex pass
+        if not phase_config.blocked_types_upper:
+            return {"entities": []}, None, None
+        
+        # Pre-parsed at config load with regex-only types filtered out
+        nlp_api_blocked_types = phase_config.nlp_entity_types
+        
+        # Only call NLP API if there are valid NLP entity types to check
+        if nlp_api_blocked_types:
+            result = self._guardrail.check_entities(text, nlp_api_blocked_types)
+            all_entities = result.results.get("entities", [])
+            error = result.error
+        else:
+            # No NLP API types, just use regex
+            all_entities = []
+            error = None
+        
+        # Filter out "OTHER" and "UNKNOWN" entity types from results
+        entities = [e for e in all_entities if e.get("type", "").upper() not in ("OTHER", "UNKNOWN")]
+        
+        # Check for blocking based on salience threshold (NLP API detection)
+        blocked_nlp = self._check_entity_blocking(entities, phase_config)
+        
+        # Also check with regex patterns for PII that NLP API might miss
+        blocked_regex = self._check_pii_with_regex(text, phase_config)
+        
+        # Combine both, avoiding duplicates
+        blocked_names = {b.get("entity_name") for b in blocked_nlp}
+        blocked = blocked_nlp.copy()
+        for regex_item in blocked_regex:
+            if regex_item.get("entity_name") not in blocked_names:
+                blocked.append(regex_item)
+        
+        return {"entities": entities}, blocked, error
+    
+    def _run_classification(self, text: str, phase_config: PhaseSettings,
+                            check_type: CheckType) -> Tuple[Dict[str, Any], Optional[List[Dict]], Optional[str]]:
+        """Content classification with category-pattern blocking."""
+        blocked_cats = phase_config.get("classify_text_blocked_categories")
+        threshold = phase_config.get("classify_text_threshold", 0.5)
+        result = self._guardrail.check_classification(text, blocked_cats, threshold)
+        categories = result.results.get("categories", [])
+        return result.results, self._check_classification_blocking(categories, phase_config), result.error
+    
+    def _run_moderation(self, text: str, phase_config: PhaseSettings,
+                        check_type: CheckType) -> Tuple[Dict[str, Any], Optional[List[Dict]], Optional[str]]:
+        """Text moderation with per-category thresholds."""
+        blocked_cats = phase_config.moderation_categories
+        thresholds = phase_config.moderation_thresholds
+        result = self._guardrail.check_moderation(text, blocked_cats, thresholds)
+        moderation = result.results.get("moderation", [])
+        return result.results, self._check_moderation_blocking(moderation, phase_config), result.error
+    
+    def _run_model_armor(self, text: str, phase_config: PhaseSettings,
+                         check_type: CheckType) -> Tuple[Dict[str, Any], Optional[List[Dict]], Optional[str]]:
+        """Model Armor check for the given prompt/response direction."""
+        # Model Armor has its own blocking logic
+        result = self._guardrail.check_model_armor(text, check_type)
+        return result.results, result.blocked_items, result.error
+    
     def _run_function(self, text: str, guardrail_type: GuardrailType, 
-                      phase_config: Dict[str, Any], check_type: CheckType) -> Dict[str, Any]:
-        """Run a single guardrail function."""
-        start_time = time.perf_counter()
+                      phase_config: PhaseSettings, check_type: CheckType) -> Dict[str, Any]:
+        """Run a single guardrail function via the dispatch table."""
+        start_time = time.perf_counter_ns()
+        handler = self._dispatch.get(guardrail_type)
+        if handler is None:
+            return {"error": "Unknown function", "time_taken_seconds": _elapsed_seconds(start_time)}
         
         try:
-            if guardrail_type == GuardrailType.NLP_SENTIMENT:
-                result = self._guardrail.check_sentiment(text)
-                elapsed = time.perf_counter() - start_time
-                
-                output = {
-                    "results": result.results,
-                    "time_taken_seconds": round(elapsed, 4)
-                }
-                
-                # Check for blocking
-                blocked = self._check_sentiment_blocking(result.results, phase_config)
-                if blocked:
-                    output["blocked_items"] = [blocked]
-                
-                if result.error:
-                    output["error"] = result.error
-                
-                return output
-            
-            elif guardrail_type == GuardrailType.NLP_ENTITIES:
-                blocked_types = phase_config.get("analyze_entities_blocked_types", [])
-                
-                # Filter out regex-only types before passing to NLP API
-                nlp_api_blocked_types = [
-                    t for t in blocked_types 
-                    if t.upper() in NLP_API_ENTITY_TYPES
-                ]
-                
-                # Only call NLP API if there are valid NLP entity types to check
-                if nlp_api_blocked_types:
-                    result = self._guardrail.check_entities(text, nlp_api_blocked_types)
-                    all_entities = result.results.get("entities", [])
-                    error = result.error
-                else:
-                    # No NLP API types, just use regex
-                    all_entities = []
-                    error = None
-                    result = type('obj', (object,), {'results': {'entities': []}, 'error': None})()
-                
-                # Filter out "OTHER" and "UNKNOWN" entity types from results
-                entities = [e for e in all_entities if e.get("type", "").upper() not in ("OTHER", "UNKNOWN")]
-                
-                elapsed = time.perf_counter() - start_time
-                
-                output = {
-                    "results": {"entities": entities},
-                    "time_taken_seconds": round(elapsed, 4)
-                }
-                
-                # Check for blocking based on salience threshold (NLP API detection)
-                blocked_nlp = self._check_entity_blocking(entities, phase_config)
-                
-                # Also check with regex patterns for PII that NLP API might miss
-                blocked_regex = self._check_pii_with_regex(text, phase_config)
-                
-                # Combine both, avoiding duplicates
-                blocked_names = {b.get("entity_name") for b in blocked_nlp}
-                blocked = blocked_nlp.copy()
-                for regex_item in blocked_regex:
-                    if regex_item.get("entity_name") not in blocked_names:
-                        blocked.append(regex_item)
-                
-                if blocked:
-                    output["blocked_items"] = blocked
-                
-                if error:
-                    output["error"] = error
-                
-                return output
-            
-            elif guardrail_type == GuardrailType.NLP_CLASSIFY:
-                blocked_cats = phase_config.get("classify_text_blocked_categories")
-                threshold = phase_config.get("classify_text_threshold", 0.5)
-                result = self._guardrail.check_classification(text, blocked_cats, threshold)
-                elapsed = time.perf_counter() - start_time
-                
-                output = {
-                    "results": result.results,
-                    "time_taken_seconds": round(elapsed, 4)
-                }
-                
-                # Check for blocking
-                categories = result.results.get("categories", [])
-                blocked = self._check_classification_blocking(categories, phase_config)
-                if blocked:
-                    output["blocked_items"] = blocked
-                
-                if result.error:
-                    output["error"] = result.error
-                
-                return output
-            
-            elif guardrail_type == GuardrailType.NLP_MODERATE:
-                blocked_cats = phase_config.get("moderate_text_blocked_categories")
-                thresholds = phase_config.get("moderate_text_thresholds")
-                result = self._guardrail.check_moderation(text, blocked_cats, thresholds)
-                elapsed = time.perf_counter() - start_time
-                
-                output = {
-                    "results": result.results,
-                    "time_taken_seconds": round(elapsed, 4)
-                }
-                
-                # Check for blocking
-                moderation = result.results.get("moderation", [])
-                blocked = self._check_moderation_blocking(moderation, phase_config)
-                if blocked:
-                    output["blocked_items"] = blocked
-                
-                if result.error:
-                    output["error"] = result.error
-                
-                return output
-            
-            elif guardrail_type == GuardrailType.MODEL_ARMOR:
-                result = self._guardrail.check_model_armor(text, check_type)
-                elapsed = time.perf_counter() - start_time
-                
-                output = {
-                    "results": result.results,
-                    "time_taken_seconds": round(elapsed, 4)
-                }
-                
-                # Model Armor has its own blocking logic
-                if result.blocked_items:
-                    output["blocked_items"] = result.blocked_items
-                
-                if result.error:
-                    output["error"] = result.error
-                
-                return output
-            
-            else:
-                elapsed = time.perf_counter() - start_time
-                return {"error": f"Unknown function", "time_taken_seconds": round(elapsed, 4)}
-                
+            results, blocked, error = handler(text, phase_config, check_type)
         except Exception as e:
-            elapsed = time.perf_counter() - start_time
-            return {"error": str(e), "time_taken_seconds": round(elapsed, 4)}
+            return {"error": str(e), "time_taken_seconds": _elapsed_seconds(start_time)}
+        
+        output = {
+            "results": results,
+            "time_taken_seconds": _elapsed_seconds(start_time)
+        }
+        if blocked:
+            output["blocked_items"] = blocked
+        if error:
+            output["error"] = error
+        return output
 
 
     def _run_functions_parallel(self, text: str, functions: List[GuardrailType],
-                                 phase_config: Dict[str, Any], check_type: CheckType) -> Dict[str, Any]:
+                                 phase_config: PhaseSettings, check_type: CheckType) -> Dict[str, Any]:
         """Run multiple guardrail functions in parallel using ThreadPoolExecutor.
         
         Args:
             text: The text to check
             functions: List of guardrail types to run
-            phase_config: Configuration for this phase
+            phase_config: Parsed settings for this phase
             check_type: Whether this is USER_PROMPT or MODEL_RESPONSE
             
         Returns:
             Dictionary with results from all functions
         """
         phase_results = {}
+        run_single_function = partial(self._run_function, text, phase_config=phase_config, check_type=check_type)
         
-        def run_single_function(guardrail_type: GuardrailType) -> Tuple[str, Dict[str, Any]]:
-            """Wrapper to run a single function and return (name, result) tuple."""
+        # Submit all tasks to the runner's shared pool
+        futures = [self._executor.submit(run_single_function, gt) for gt in functions]
+        
+        # Collect in config order; total wait is the same as collecting as they complete
+        for guardrail_type, future in zip(functions, futures):
             func_name = DISPLAY_NAMES.get(guardrail_type, str(guardrail_type))
-            func_result = self._run_function(text, guardrail_type, phase_config, check_type)
-            return func_name, func_result
-        
-        # Use ThreadPoolExecutor for parallel execution
-        with ThreadPoolExecutor(max_workers=len(functions)) as executor:
-            # Submit all tasks
-            future_to_type = {
-                executor.submit(run_single_function, gt): gt 
-                for gt in functions
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_type):
-                try:
-                    func_name, func_result = future.result()
-                    phase_results[func_name] = func_result
-                except Exception as e:
-                    guardrail_type = future_to_type[future]
-                    func_name = DISPLAY_NAMES.get(guardrail_type, str(guardrail_type))
-                    phase_results[func_name] = {"error": str(e), "time_taken_seconds": 0.0}
+            try:
+                phase_results[func_name] = future.result()
+            except Exception as e:
+                phase_results[func_name] = {"error": str(e), "time_taken_seconds": 0.0}
         
         return phase_results
 
 
     def _run_functions_sequential(self, text: str, functions: List[GuardrailType],
-                                   phase_config: Dict[str, Any], check_type: CheckType) -> Dict[str, Any]:
+                                   phase_config: PhaseSettings, check_type: CheckType) -> Dict[str, Any]:
         """Run multiple guardrail functions sequentially.
         
         Args:
             text: The text to check
             functions: List of guardrail types to run
-            phase_config: Configuration for this phase
+            phase_config: Parsed settings for this phase
             check_type: Whether this is USER_PROMPT or MODEL_RESPONSE
             
         Returns:
             Dictionary with results from all functions
         """
         phase_results = {}
+        run_single_function = partial(self._run_function, text, phase_config=phase_config, check_type=check_type)
         
         for guardrail_type in functions:
             func_name = DISPLAY_NAMES.get(guardrail_type, str(guardrail_type))
-            func_result = self._run_function(text, guardrail_type, phase_config, check_type)
-            phase_results[func_name] = func_result
+            phase_results[func_name] = run_single_function(guardrail_type)
         
         return phase_results
 
 
 
     
+    def _run_phase(self, text: str, phase_config: PhaseSettings, functions: List[GuardrailType],
+                   execution_type: str, check_type: CheckType) -> Dict[str, Any]:
+        """Run one phase's functions (parallel or sequential) and add phase timing."""
+        phase_start = time.perf_counter_ns()
+        
+        # Choose execution method based on config
+        if execution_type == "parallel":
+            phase_results = self._run_functions_parallel(text, functions, phase_config, check_type)
+        else:
+            phase_results = self._run_functions_sequential(text, functions, phase_config, check_type)
+        
+        phase_results["time_taken_seconds"] = _elapsed_seconds(phase_start)
+        phase_results["execution_type"] = execution_type
+        return phase_results
+
+
     def _build_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Build summary from results with separate input/output sections."""
         overall_passed = True
@@ -748,7 +1139,8 @@ class GuardrailRunner:
 
 
     
-    def run(self, text: str, generated_text: Optional[str] = None) -> Dict[str, Any]:
+    def run(self, text: str, generated_text: Optional[str] = None, include_text: Optional[bool] = None,
+            _phases: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
         """
         Run guardrail checks on text based on config.
         
@@ -756,6 +1148,9 @@ class GuardrailRunner:
             text: The input text to check (user prompt)
             generated_text: Optional model-generated response to check. 
                            Required if config has "output" phase.
+            include_text: Echo input_text/generated_text back under results["text"]
+                          (default: the runner's include_text_in_result)
+            _phases: Internal - restrict to these config phases (used by run_input/run_output)
             
         Returns:
             Results with function outputs, timing, and summary
@@ -769,62 +1164,57 @@ class GuardrailRunner:
             return error_result
         
         results = {}
-        total_start = time.perf_counter()
-        
-        # Process input phase
-        if "input" in self._config:
-            phase_config = self._config["input"]
-            check_type = CheckType.USER_PROMPT
+        total_start = time.perf_counter_ns()
+        has_generated_text = generated_text is not None and bool(generated_text.strip())
+        run_input_phase = "input" in self._config and (_phases is None or "input" in _phases)
+        run_output_phase = "output" in self._config and (_phases is None or "output" in _phases)
+        
+        # Start output phase on the phase pool so it overlaps with the input phase below
+        # (top-level "overlap_phases": false runs it after the input phase instead)
+        output_future = None
+        output_functions, output_execution_type = [], None
+        if run_output_phase and has_generated_text:
+            output_functions, output_execution_type = self._get_functions_for_phase("output")
+            if output_functions and self._config.get("overlap_phases", True):
+                output_future = self._phase_executor.submit(
+                    self._run_phase, generated_text, self._phase_settings["output"],
+                    output_functions, output_execution_type, CheckType.MODEL_RESPONSE
+                )
+        
+        # Process input phase on the calling thread
+        if run_input_phase:
             functions, execution_type = self._get_functions_for_phase("input")
-            
             if functions:
-                phase_start = time.perf_counter()
-                
-                # Choose execution method based on config
-                if execution_type == "parallel":
-                    phase_results = self._run_functions_parallel(text, functions, phase_config, check_type)
-                else:
-                    phase_results = self._run_functions_sequential(text, functions, phase_config, check_type)
-                
-                phase_results["time_taken_seconds"] = round(time.perf_counter() - phase_start, 4)
-                phase_results["execution_type"] = execution_type
-                results["input"] = phase_results
+                results["input"] = self._run_phase(
+                    text, self._phase_settings["input"], functions, execution_type, CheckType.USER_PROMPT
+                )
         
         # Process output phase - only if generated_text is provided
-        if "output" in self._config:
-            if generated_text is None or not generated_text.strip():
+        if run_output_phase:
+            if not has_generated_text:
                 # Config has output phase but no generated_text provided
                 results["output"] = {
                     "skipped": True,
                     "message": "Output phase skipped: No generated_text provided. Pass generated_text parameter to check model responses.",
                     "time_taken_seconds": 0.0
                 }
-            else:
-                phase_config = self._config["output"]
-                check_type = CheckType.MODEL_RESPONSE
-                functions, execution_type = self._get_functions_for_phase("output")
-                
-                if functions:
-                    phase_start = time.perf_counter()
-                    
-                    # Choose execution method based on config
-                    if execution_type == "parallel":
-                        phase_results = self._run_functions_parallel(generated_text, functions, phase_config, check_type)
-                    else:
-                        phase_results = self._run_functions_sequential(generated_text, functions, phase_config, check_type)
-                    
-                    phase_results["time_taken_seconds"] = round(time.perf_counter() - phase_start, 4)
-                    phase_results["execution_type"] = execution_type
-                    results["output"] = phase_results
-        
-        results["total_time_seconds"] = round(time.perf_counter() - total_start, 4)
+            elif output_future is not None:
+                results["output"] = output_future.result()
+            elif output_functions:
+                results["output"] = self._run_phase(
+                    generated_text, self._phase_settings["output"], output_functions,
+                    output_execution_type, CheckType.MODEL_RESPONSE
+                )
+        
+        results["total_time_seconds"] = _elapsed_seconds(total_start)
         results["summary"] = self._build_summary(results)
         
-        # Add text information to results
-        results["text"] = {
-            "input_text": text,
-            "generated_text": generated_text
-        }
+        # Only echo the texts back on request - large prompts would otherwise be carried twice
+        if include_text if include_text is not None else self._include_text_in_result:
+            results["text"] = {
+                "input_text": text,
+                "generated_text": generated_text
+            }
         
         # Log the query and result
         self._log_query(text, results)
@@ -834,14 +1224,83 @@ class GuardrailRunner:
 
 
     
+    def run_batch(self, texts: List[str], generated_texts: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Run guardrail checks on many texts concurrently.
+        
+        Args:
+            texts: Input texts to check (user prompts)
+            generated_texts: Optional model responses, one per text (None entries skip the output phase)
+            
+        Returns:
+            One run() result per text, in the same order as texts
+        """
+        if generated_texts is None:
+            generated_texts = [None] * len(texts)
+        elif len(generated_texts) != len(texts):
+            raise ValueError("generated_texts must have the same length as texts")
+        
+        pairs = list(zip(texts, generated_texts))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        # Distinct texts first, all in flight together (each run() still fans out per phase). Repeats
+        # run afterwards so they are answered from the result cache instead of racing it with
+        # duplicate RPCs, while still getting their own result and log entry.
+        for indexes in _split_repeats(pairs):
+            for i, result in zip(indexes, self._batch_executor.map(lambda i: self.run(*pairs[i]), indexes)):
+                results[i] = result
+        return results
+
+
+    
+    async def arun(self, text: str, generated_text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Awaitable run() for asyncio callers.
+        
+        The GCP clients are blocking gRPC stubs, so the checks still run on the
+        runner's pools; awaiting this keeps the caller's event loop free meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._batch_executor, self.run, text, generated_text)
+
+
+    
+    async def arun_batch(self, texts: List[str], generated_texts: Optional[List[Optional[str]]] = None,
+                         concurrency: int = 32) -> List[Dict[str, Any]]:
+        """
+        Awaitable run_batch(): pipeline many texts with at most `concurrency` run() calls in flight.
+        
+        Args:
+            texts: Input texts to check (user prompts)
+            generated_texts: Optional model responses, one per text (None entries skip the output phase)
+            concurrency: Max texts checked at once (also bounded by the runner's batch pool size)
+            
+        Returns:
+            One run() result per text, in the same order as texts
+        """
+        if generated_texts is None:
+            generated_texts = [None] * len(texts)
+        elif len(generated_texts) != len(texts):
+            raise ValueError("generated_texts must have the same length as texts")
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run_one(text: str, generated_text: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.arun(text, generated_text)
+        
+        pairs = list(zip(texts, generated_texts))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        # Repeated texts wait for the first copy so they hit the result cache (see run_batch)
+        for indexes in _split_repeats(pairs):
+            for i, result in zip(indexes, await asyncio.gather(*(run_one(*pairs[i]) for i in indexes))):
+                results[i] = result
+        return results
+
+
+    
     def run_input(self, text: str) -> Dict[str, Any]:
         """Run only input phase checks."""
-        # Temporarily modify config
-        original_config = self._config.copy()
-        self._config = {"input": self._config.get("input", {})}
-        result = self.run(text)
-        self._config = original_config
-        return result
+        return self.run(text, _phases=("input",))
 
 
 
@@ -853,15 +1312,8 @@ class GuardrailRunner:
                 "error": "Generated text cannot be empty for output phase checks",
                 "summary": {"passed": False, "output": {"passed": False, "failures": [{"error": "Generated text cannot be empty"}]}}
             }
-        original_config = self._config.copy()
-        self._config = {"output": self._config.get("output", {})}
-        # Pass empty string for input text, generated_text for output
-        result = self.run("_output_only_check_", generated_text=generated_text)
-        self._config = original_config
-        # Remove the dummy input from results if present
-        if "input" in result:
-            del result["input"]
-        return result
+        # Placeholder input text; the input phase is not run
+        return self.run("_output_only_check_", generated_text=generated_text, _phases=("output",))
 
         
     
@@ -871,21 +1323,47 @@ class GuardrailRunner:
     
     def get_log_file_path(self) -> Optional[str]:
         """Get the current log file path."""
-        return self._log_file_path if self._enable_logging else None
+        return self._log_writer.file_path if self._log_writer is not None else None
     
     def get_logs(self) -> List[Dict[str, Any]]:
         """Read and return all logs from current log file."""
-        if not self._enable_logging or not self._log_file_path:
+        if self._log_writer is None:
             return []
         
-        if not os.path.exists(self._log_file_path):
+        # Make sure queued entries are on disk first
+        self._log_writer.flush()
+        log_file_path = self._log_writer.file_path
+        
+        if not os.path.exists(log_file_path):
             return []
         
+        logs = []
         try:
-            with open(self._log_file_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            with open(log_file_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        logs.append(_json_loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except IOError:
             return []
+        return logs
+
+    def close(self) -> None:
+        """Shut down the worker pools, flush pending log entries and stop the log writer. Safe to call twice."""
+        # Detach so the finalizer never runs as well, then clean up waiting for in-flight work
+        state = self._finalizer.detach()
+        if state is not None:
+            _, cleanup, args, _ = state
+            cleanup(*args, wait=True)
+    
+    def __enter__(self) -> "GuardrailRunner":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
 
 
@@ -7,12 +7,23 @@ Features:
     - Model Armor: RAI, SDP, Prompt Injection, Malicious URIs, CSAM detection
     - Flexible filter selection and threshold configuration
     - Case-insensitive category names (e.g., "person", "toxic", "violent")
+
+Performance:
+    Every check_* call is a blocking network round-trip to a GCP API; local
+    Python work is negligible next to it. Speed-ups belong in concurrency,
+    transport and (de)serialization, not in compiling the wrappers.
 """
 
 
 from MODEL_ARMOR_CLIENT import ModelArmorClient
 from NLP_CLIENT import NLPClient
 from google.api_core import exceptions as google_exceptions
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+import copy
+import hashlib
+import threading
+import time
 from ENUM_CLASSES import *
 
 
@@ -23,6 +34,60 @@ DEFAULT_LOCATION = "us-central1"
 DEFAULT_PROJECT = "ai-experiments-345006"
 DEFAULT_TEMPLATE = "litellm-gcp-guard"
 
+# Guardrails served by the NLP API - two or more of them share one annotateText call in check()
+NLP_GUARDRAILS = (GuardrailType.NLP_SENTIMENT, GuardrailType.NLP_ENTITIES,
+                  GuardrailType.NLP_CLASSIFY, GuardrailType.NLP_MODERATE)
+
+# Shared by all check() calls so NLP and Model Armor round-trips overlap without a pool per call
+CHECK_EXECUTOR = ThreadPoolExecutor(max_workers=max(8, 2 * len(GuardrailType)), thread_name_prefix="gemini-guardrail")
+
+# Result cache defaults: identical text + settings within the TTL skip the RPC
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_CACHE_TTL_SECONDS = 300.0
+
+
+
+def _moderation_results(result: Dict[str, Any]) -> Dict[str, Any]:
+    """GuardrailResult.results for an NLPClient moderation result, keeping the trivially_passed marker."""
+    if result.get("trivially_passed"):
+        return {"moderation": result["moderation"], "trivially_passed": True}
+    return {"moderation": result["moderation"]}
+
+
+class _ResultCache:
+    """Thread-safe LRU of GuardrailResults with a time-to-live. Stores and hands out copies."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> Optional[GuardrailResult]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        # Callers (e.g. check()) annotate blocked items in place
+        return copy.deepcopy(result)
+    
+    def put(self, key: tuple, result: GuardrailResult) -> None:
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, result)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
 
 
 # Complete Gemini Guardrail Wrapper
@@ -36,7 +101,8 @@ class GeminiGuardrail:
         - Check types: "user_prompt" or "model_response"
     """
     
-    def __init__(self, key_path: Optional[str] = None, project_id: Optional[str] = None, location_id: Optional[str] = None, template_id: Optional[str] = None):
+    def __init__(self, key_path: Optional[str] = None, project_id: Optional[str] = None, location_id: Optional[str] = None, template_id: Optional[str] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE, cache_ttl: float = DEFAULT_CACHE_TTL_SECONDS):
         """
         Initialize the unified guardrail.
         
@@ -45,6 +111,8 @@ class GeminiGuardrail:
             project_id: GCP project ID (for Model Armor)
             location_id: GCP region (for Model Armor)
             template_id: Model Armor template ID
+            cache_size: Max cached results, keyed by text hash + settings (0 disables caching)
+            cache_ttl: Seconds a cached result stays valid
         """
         self._key_path = key_path or KEY_PATH
         self._project_id = project_id or DEFAULT_PROJECT
@@ -53,20 +121,104 @@ class GeminiGuardrail:
         
         self._nlp_client: Optional[NLPClient] = None
         self._armor_client: Optional[ModelArmorClient] = None
+        # Guards lazy client creation - checks run concurrently from several threads
+        self._init_lock = threading.Lock()
+        
+        # GuardrailType -> callable(text, options) used by check(); options holds check()'s settings
+        self._check_dispatch = {
+            GuardrailType.NLP_SENTIMENT: lambda text, o: self.check_sentiment(text),
+            GuardrailType.NLP_ENTITIES: lambda text, o: self.check_entities(text, o["blocked_entity_types"]),
+            GuardrailType.NLP_CLASSIFY: lambda text, o: self.check_classification(
+                text, o["blocked_classification_categories"], o["classification_threshold"]),
+            GuardrailType.NLP_MODERATE: lambda text, o: self.check_moderation(
+                text, o["blocked_moderation_categories"], o["moderation_thresholds"]),
+            GuardrailType.MODEL_ARMOR: lambda text, o: self.check_model_armor(text, o["check_type"]),
+        }
+        self._cache = _ResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+        
+        # Defaults used when a check passes None - set with configure()
+        self._blocked_entity_types: Optional[List[EntityType]] = None
+        self._blocked_moderation_categories: Optional[List[ModerationCategory]] = None
+        self._moderation_thresholds: Optional[Dict[ModerationCategory, float]] = None
+        self._check_type: CheckType = CheckType.USER_PROMPT
+    
+    def configure(self, blocked_entity_types: Optional[List[Union[str, EntityType]]] = None,
+                  blocked_moderation_categories: Optional[List[Union[str, ModerationCategory]]] = None,
+                  moderation_thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None,
+                  check_type: Optional[Union[str, CheckType]] = None) -> "GeminiGuardrail":
+        """
+        Set instance-wide defaults, validated and converted to enums once.
+        
+        check_entities / check_moderation / check_model_armor / check() fall back to these
+        when the matching argument is None. Raises ValueError for unknown names.
+        """
+        self._blocked_entity_types = parse_entity_types(blocked_entity_types)
+        self._blocked_moderation_categories = parse_moderation_categories(blocked_moderation_categories)
+        self._moderation_thresholds = parse_moderation_thresholds(moderation_thresholds)
+        self._check_type = parse_check_type(check_type) if check_type is not None else CheckType.USER_PROMPT
+        return self
     
     def _get_nlp_client(self) -> NLPClient:
-        """Lazy initialization of NLP client."""
-        if self._nlp_client is None:
-            self._nlp_client = NLPClient(self._key_path)
-        return self._nlp_client
+        """Lazy, thread-safe initialization of NLP client."""
+        client = self._nlp_client
+        if client is None:
+            with self._init_lock:
+                client = self._nlp_client
+                if client is None:
+                    client = self._nlp_client = NLPClient(self._key_path)
+        return client
     
     def _get_armor_client(self) -> ModelArmorClient:
-        """Lazy initialization of Model Armor client."""
-        if self._armor_client is None:
-            self._armor_client = ModelArmorClient(
-                self._key_path, self._project_id, self._location_id, self._template_id
-            )
-        return self._armor_client
+        """Lazy, thread-safe initialization of Model Armor client."""
+        client = self._armor_client
+        if client is None:
+            with self._init_lock:
+                client = self._armor_client
+                if client is None:
+                    client = self._armor_client = ModelArmorClient(
+                        self._key_path, self._project_id, self._location_id, self._template_id
+                    )
+        return client
+
+    
+    def clear_cache(self) -> None:
+        """Drop all cached guardrail results."""
+        if self._cache is not None:
+            self._cache.clear()
+    
+    def _cache_key(self, guardrail_type: GuardrailType, text: str,
+                   blocked_entity_types: Optional[List[Union[str, EntityType]]] = None,
+                   blocked_classification_categories: Optional[List[str]] = None,
+                   classification_threshold: float = 0.5,
+                   blocked_moderation_categories: Optional[List[Union[str, ModerationCategory]]] = None,
+                   moderation_thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None,
+                   check_type: Union[str, CheckType] = CheckType.USER_PROMPT) -> tuple:
+        """(type, text digest, canonical settings) - only the settings that affect this guardrail."""
+        if guardrail_type == GuardrailType.NLP_ENTITIES:
+            parsed = parse_entity_types(blocked_entity_types)
+            params = (tuple(parsed) if parsed is not None else None,)
+        elif guardrail_type == GuardrailType.NLP_CLASSIFY:
+            params = (tuple(blocked_classification_categories) if blocked_classification_categories is not None else None,
+                      classification_threshold)
+        elif guardrail_type == GuardrailType.NLP_MODERATE:
+            parsed = parse_moderation_categories(blocked_moderation_categories)
+            parsed_thresholds = parse_moderation_thresholds(moderation_thresholds)
+            params = (tuple(parsed) if parsed is not None else None,
+                      tuple(sorted(parsed_thresholds.items())) if parsed_thresholds is not None else None)
+        elif guardrail_type == GuardrailType.MODEL_ARMOR:
+            params = (parse_check_type(check_type),)
+        else:
+            params = ()
+        return guardrail_type, hashlib.blake2b(text.encode(), digest_size=16).digest(), params
+    
+    def _cache_get(self, key: tuple) -> Optional[GuardrailResult]:
+        return self._cache.get(key) if self._cache is not None else None
+    
+    def _cache_put(self, key: tuple, result: GuardrailResult) -> GuardrailResult:
+        """Store a successful result and return it."""
+        if self._cache is not None and not result.error:
+            self._cache.put(key, result)
+        return result
 
     
     def _handle_error(self, e: Exception, guardrail_type: str) -> GuardrailResult:
@@ -96,8 +248,13 @@ class GeminiGuardrail:
             if not text or not text.strip():
                 return GuardrailResult(guardrail_type=GuardrailType.NLP_SENTIMENT.value, error="Text cannot be empty")
 
+            key = self._cache_key(GuardrailType.NLP_SENTIMENT, text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
             result = self._get_nlp_client().analyze_sentiment(text)
-            return GuardrailResult(guardrail_type=GuardrailType.NLP_SENTIMENT.value, results=result)
+            return self._cache_put(key, GuardrailResult(guardrail_type=GuardrailType.NLP_SENTIMENT.value, results=result))
 
         except Exception as e:
             return self._handle_error(e, GuardrailType.NLP_SENTIMENT.value)
@@ -119,9 +276,17 @@ class GeminiGuardrail:
             if not text or not text.strip():
                 return GuardrailResult(guardrail_type=GuardrailType.NLP_ENTITIES.value, error="Text cannot be empty")
 
+            if blocked_types is None:
+                blocked_types = self._blocked_entity_types
+
+            key = self._cache_key(GuardrailType.NLP_ENTITIES, text, blocked_entity_types=blocked_types)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
             result = self._get_nlp_client().analyze_entities(text, blocked_types)
-            return GuardrailResult(guardrail_type=GuardrailType.NLP_ENTITIES.value,
-                results={"entities": result["entities"]}, blocked_items=result["blocked"])
+            return self._cache_put(key, GuardrailResult(guardrail_type=GuardrailType.NLP_ENTITIES.value,
+                results={"entities": result["entities"]}, blocked_items=result["blocked"]))
 
         except Exception as e:
             return self._handle_error(e, GuardrailType.NLP_ENTITIES.value)
@@ -137,13 +302,19 @@ class GeminiGuardrail:
             if not text or not text.strip():
                 return GuardrailResult(guardrail_type=GuardrailType.NLP_CLASSIFY.value, error="Text cannot be empty")
 
+            key = self._cache_key(GuardrailType.NLP_CLASSIFY, text, blocked_classification_categories=blocked_categories,
+                                  classification_threshold=threshold)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
             result = self._get_nlp_client().classify_text(text, blocked_categories, threshold)
 
             if "error" in result:
                 return GuardrailResult(guardrail_type=GuardrailType.NLP_CLASSIFY.value, error=result["error"])
 
-            return GuardrailResult(guardrail_type=GuardrailType.NLP_CLASSIFY.value,
-                results={"categories": result["categories"]}, blocked_items=result["blocked"])
+            return self._cache_put(key, GuardrailResult(guardrail_type=GuardrailType.NLP_CLASSIFY.value,
+                results={"categories": result["categories"]}, blocked_items=result["blocked"]))
 
         except Exception as e:
             return self._handle_error(e, GuardrailType.NLP_CLASSIFY.value)
@@ -168,9 +339,20 @@ class GeminiGuardrail:
             if not text or not text.strip():
                 return GuardrailResult(guardrail_type=GuardrailType.NLP_MODERATE.value, error="Text cannot be empty")
 
+            if blocked_categories is None:
+                blocked_categories = self._blocked_moderation_categories
+            if thresholds is None:
+                thresholds = self._moderation_thresholds
+
+            key = self._cache_key(GuardrailType.NLP_MODERATE, text, blocked_moderation_categories=blocked_categories,
+                                  moderation_thresholds=thresholds)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
             result = self._get_nlp_client().moderate_text(text, blocked_categories, thresholds)
-            return GuardrailResult(guardrail_type=GuardrailType.NLP_MODERATE.value,
-                results={"moderation": result["moderation"]}, blocked_items=result["blocked"])
+            return self._cache_put(key, GuardrailResult(guardrail_type=GuardrailType.NLP_MODERATE.value,
+                results=_moderation_results(result), blocked_items=result["blocked"]))
 
         except Exception as e:
             return self._handle_error(e, GuardrailType.NLP_MODERATE.value)
@@ -179,20 +361,26 @@ class GeminiGuardrail:
 
     
     # Checking Model Armor from Model Armor Client - user prompt or model response can be provided
-    def check_model_armor(self, text: str, check_type: Union[str, CheckType] = CheckType.USER_PROMPT) -> GuardrailResult:
+    def check_model_armor(self, text: str, check_type: Optional[Union[str, CheckType]] = None) -> GuardrailResult:
         """
         Check text with Model Armor (RAI, SDP, Jailbreak, Malicious URIs, CSAM).
         
         Args:
             text: Text to check
-            check_type: "user_prompt" or "model_response" (case-insensitive), or CheckType enum
+            check_type: "user_prompt" or "model_response" (case-insensitive), or CheckType enum.
+                        None uses the configured default (user_prompt unless changed via configure()).
         """
         try:
             if not text or not text.strip():
                 return GuardrailResult(guardrail_type=GuardrailType.MODEL_ARMOR.value, error="Text cannot be empty")
             
             # Parse check_type if string
-            parsed_check_type = parse_check_type(check_type)
+            parsed_check_type = parse_check_type(check_type) if check_type is not None else self._check_type
+            
+            key = self._cache_key(GuardrailType.MODEL_ARMOR, text, check_type=parsed_check_type)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
             
             client = self._get_armor_client()
             if parsed_check_type == CheckType.USER_PROMPT:
@@ -200,11 +388,11 @@ class GeminiGuardrail:
             else:
                 result = client.sanitize_model_response(text)
             
-            return GuardrailResult(guardrail_type=GuardrailType.MODEL_ARMOR.value,
+            return self._cache_put(key, GuardrailResult(guardrail_type=GuardrailType.MODEL_ARMOR.value,
                 results={"filter_results": result["filter_results"], 
                          "overall_match_state": result["overall_match_state"]},
                 blocked_items=result["blocked_filters"]
-            )
+            ))
 
         except Exception as e:
             return self._handle_error(e, GuardrailType.MODEL_ARMOR.value)
@@ -212,9 +400,75 @@ class GeminiGuardrail:
 
 
     
+    # Checking several NLP guardrails with one annotateText request
+    def _check_nlp_combined(self, text: str, nlp_guardrails: List[GuardrailType],
+                            blocked_entity_types: Optional[List[Union[str, EntityType]]] = None,
+                            blocked_classification_categories: Optional[List[str]] = None,
+                            classification_threshold: float = 0.5,
+                            blocked_moderation_categories: Optional[List[Union[str, ModerationCategory]]] = None,
+                            moderation_thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None) -> Dict[GuardrailType, GuardrailResult]:
+        """Same results as the individual check_* methods, from a single NLP round-trip."""
+        results = {}
+        try:
+            # Serve cached guardrails first; only the rest go into the annotateText request
+            keys = {
+                g: self._cache_key(g, text, blocked_entity_types, blocked_classification_categories,
+                                   classification_threshold, blocked_moderation_categories, moderation_thresholds)
+                for g in nlp_guardrails
+            }
+            for g, key in keys.items():
+                cached = self._cache_get(key)
+                if cached is not None:
+                    results[g] = cached
+            missing = [g for g in keys if g not in results]
+            if not missing:
+                return results
+            
+            annotated = self._get_nlp_client().annotate_text(
+                text,
+                sentiment=GuardrailType.NLP_SENTIMENT in missing,
+                entities=GuardrailType.NLP_ENTITIES in missing,
+                classify=GuardrailType.NLP_CLASSIFY in missing,
+                moderate=GuardrailType.NLP_MODERATE in missing,
+                blocked_types=blocked_entity_types,
+                blocked_categories=blocked_classification_categories,
+                threshold=classification_threshold,
+                blocked_moderation_categories=blocked_moderation_categories,
+                moderation_thresholds=moderation_thresholds
+            )
+        except Exception as e:
+            return {g: results.get(g) or self._handle_error(e, g.value) for g in nlp_guardrails}
+        
+        if "sentiment" in annotated:
+            results[GuardrailType.NLP_SENTIMENT] = GuardrailResult(
+                guardrail_type=GuardrailType.NLP_SENTIMENT.value, results=annotated["sentiment"])
+        if "entities" in annotated:
+            result = annotated["entities"]
+            results[GuardrailType.NLP_ENTITIES] = GuardrailResult(guardrail_type=GuardrailType.NLP_ENTITIES.value,
+                results={"entities": result["entities"]}, blocked_items=result["blocked"])
+        if "classify" in annotated:
+            result = annotated["classify"]
+            if "error" in result:
+                results[GuardrailType.NLP_CLASSIFY] = GuardrailResult(
+                    guardrail_type=GuardrailType.NLP_CLASSIFY.value, error=result["error"])
+            else:
+                results[GuardrailType.NLP_CLASSIFY] = GuardrailResult(guardrail_type=GuardrailType.NLP_CLASSIFY.value,
+                    results={"categories": result["categories"]}, blocked_items=result["blocked"])
+        if "moderate" in annotated:
+            result = annotated["moderate"]
+            results[GuardrailType.NLP_MODERATE] = GuardrailResult(guardrail_type=GuardrailType.NLP_MODERATE.value,
+                results=_moderation_results(result), blocked_items=result["blocked"])
+        
+        for g in missing:
+            self._cache_put(keys[g], results[g])
+        return results
+
+
+
+    
     # Checking all guardrails - multiple guardrails can be run at once
     def check(self, text: str, guardrails: Optional[List[GuardrailType]] = None, 
-              check_type: Union[str, CheckType] = CheckType.USER_PROMPT,
+              check_type: Optional[Union[str, CheckType]] = None,
               # NLP Entity config
               blocked_entity_types: Optional[List[Union[str, EntityType]]] = None,
               # NLP Classify config
@@ -222,19 +476,22 @@ class GeminiGuardrail:
               classification_threshold: float = 0.5,
               # NLP Moderate config
               blocked_moderation_categories: Optional[List[Union[str, ModerationCategory]]] = None,
-              moderation_thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None) -> Dict[str, Any]:
+              moderation_thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None,
+              fail_fast: bool = False) -> Dict[str, Any]:
         """
         Run multiple guardrails and combine results.
         
         Args:
             text: Text to check
             guardrails: List of guardrails to run (default: all)
-            check_type: "user_prompt" or "model_response" (case-insensitive)
+            check_type: "user_prompt" or "model_response" (case-insensitive); None uses the configured default
             blocked_entity_types: Entity types to block (e.g., ["person", "location"])
             blocked_classification_categories: Classification categories to block
             classification_threshold: Threshold for classification blocking
             blocked_moderation_categories: Moderation categories to block (e.g., ["toxic", "violent"])
             moderation_thresholds: Per-category thresholds (e.g., {"toxic": 0.3})
+            fail_fast: Return as soon as any guardrail blocks; guardrails still pending are
+                       listed under "guardrails_skipped" instead of being waited for
             
         Returns:
             Combined results from all guardrails
@@ -243,40 +500,96 @@ class GeminiGuardrail:
         if guardrails is None:
             guardrails = list(GuardrailType)
         
+        # Fall back to the defaults from configure()
+        if blocked_entity_types is None:
+            blocked_entity_types = self._blocked_entity_types
+        if blocked_moderation_categories is None:
+            blocked_moderation_categories = self._blocked_moderation_categories
+        if moderation_thresholds is None:
+            moderation_thresholds = self._moderation_thresholds
+        
         results = {}
         all_blocked_items = []
         errors = []
         
+        # Two or more NLP guardrails: one annotateText RPC instead of one call each
+        combined_future = None
+        nlp_guardrails = [g for g in guardrails if g in NLP_GUARDRAILS]
+        if len(set(nlp_guardrails)) > 1 and text and text.strip():
+            combined_future = CHECK_EXECUTOR.submit(
+                self._check_nlp_combined, text, nlp_guardrails, blocked_entity_types,
+                blocked_classification_categories, classification_threshold,
+                blocked_moderation_categories, moderation_thresholds
+            )
+        
+        # Start every remaining call right away so their network latency overlaps
+        options = {
+            "check_type": check_type,
+            "blocked_entity_types": blocked_entity_types,
+            "blocked_classification_categories": blocked_classification_categories,
+            "classification_threshold": classification_threshold,
+            "blocked_moderation_categories": blocked_moderation_categories,
+            "moderation_thresholds": moderation_thresholds,
+        }
+        pending = []
         for guardrail in guardrails:
-            if guardrail == GuardrailType.NLP_SENTIMENT:
-                result = self.check_sentiment(text)
-            elif guardrail == GuardrailType.NLP_ENTITIES:
-                result = self.check_entities(text, blocked_entity_types)
-            elif guardrail == GuardrailType.NLP_CLASSIFY:
-                result = self.check_classification(text, blocked_classification_categories, classification_threshold)
-            elif guardrail == GuardrailType.NLP_MODERATE:
-                result = self.check_moderation(text, blocked_moderation_categories, moderation_thresholds)
-            elif guardrail == GuardrailType.MODEL_ARMOR:
-                result = self.check_model_armor(text, check_type)
+            if combined_future is not None and guardrail in NLP_GUARDRAILS:
+                pending.append((guardrail, None))
+                continue
+            handler = self._check_dispatch.get(guardrail)
+            if handler is None:
+                continue
+            pending.append((guardrail, CHECK_EXECUTOR.submit(handler, text, options)))
+        
+        if fail_fast:
+            # Wait only until the first block, then cancel whatever has not started yet
+            all_futures = [f for f in {combined_future, *(f for _, f in pending)} if f is not None]
+            for done in as_completed(all_futures):
+                value = done.result()
+                if isinstance(value, dict):
+                    found = any(r.blocked_items for r in value.values())
+                else:
+                    found = bool(value.blocked_items)
+                if found:
+                    break
+            for f in all_futures:
+                f.cancel()
+        
+        def finished(future) -> bool:
+            return not fail_fast or (future.done() and not future.cancelled())
+        
+        # Collect in the requested order
+        skipped = []
+        combined = combined_future.result() if combined_future is not None and finished(combined_future) else {}
+        for guardrail, future in pending:
+            if future is None:
+                if guardrail not in combined:
+                    skipped.append(guardrail.value)
+                    continue
+                result = combined[guardrail]
+            elif finished(future):
+                result = future.result()
             else:
+                skipped.append(guardrail.value)
                 continue
             
             results[guardrail.value] = result.to_dict()
             
-            if result.blocked_items:
-                for item in result.blocked_items:
-                    item["source"] = guardrail.value
-                    all_blocked_items.append(item)
+            # Annotate copies - the result's own items back its cached to_dict()/to_json() output
+            all_blocked_items.extend({**item, "source": guardrail.value} for item in result.blocked_items)
             
             if result.error:
                 errors.append(f"{guardrail.value}: {result.error}")
         
         output = {
-            "text_preview": text[:100] + "..." if len(text) > 100 else text,
+            "text_preview": text if len(text) <= 100 else f"{text[:100]}...",
             "guardrails_run": [g.value for g in guardrails],
             "results": results
         }
         
+        if skipped:
+            output["guardrails_skipped"] = skipped
+        
         # Only include blocked_items if there are any
         if all_blocked_items:
             output["blocked_items"] = all_blocked_items
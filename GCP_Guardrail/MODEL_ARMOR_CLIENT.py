@@ -1,32 +1,119 @@
 from google.cloud import modelarmor_v1
 from google.oauth2 import service_account
 from google.api_core.client_options import ClientOptions
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ENUM_CLASSES import CheckType
+from functools import lru_cache
 import os
 
 
+_CONFIDENCE_UNSPECIFIED = "CONFIDENCE_LEVEL_UNSPECIFIED"
+
+
+@lru_cache(maxsize=8)
+def _load_credentials(key_path: str) -> service_account.Credentials:
+    """Service account credentials, read from disk once per key file."""
+    if not os.path.exists(key_path):
+        raise FileNotFoundError(f"Service account key not found: {key_path}")
+    return service_account.Credentials.from_service_account_file(key_path)
+
+
+def _state_name(state) -> str:
+    """Enum name of an execution/match state, or "UNKNOWN" when unset."""
+    return state.name if state else "UNKNOWN"
+
+
+def _confidence_name(level) -> Optional[str]:
+    """Enum name of a confidence level, or None when unset/unspecified."""
+    if not level:
+        return None
+    name = level.name
+    return name if name != _CONFIDENCE_UNSPECIFIED else None
+
+
+def _parse_rai(filter_value, result: Dict[str, Any]) -> None:
+    rai = filter_value.rai_filter_result
+    if not rai:
+        return
+    result["execution_state"] = _state_name(rai.execution_state)
+    result["match_state"] = _state_name(rai.match_state)
+    result["categories"] = {
+        cat_name: {
+            "match_state": _state_name(cat_result.match_state),
+            "confidence_level": _confidence_name(cat_result.confidence_level)
+        }
+        for cat_name, cat_result in rai.rai_filter_type_results.items()
+    }
+
+
+def _parse_sdp(filter_value, result: Dict[str, Any]) -> None:
+    sdp = filter_value.sdp_filter_result
+    if sdp and sdp.inspect_result:
+        result["execution_state"] = _state_name(sdp.inspect_result.execution_state)
+        result["match_state"] = _state_name(sdp.inspect_result.match_state)
+
+
+def _parse_pi_and_jailbreak(filter_value, result: Dict[str, Any]) -> None:
+    pij = filter_value.pi_and_jailbreak_filter_result
+    if not pij:
+        return
+    result["execution_state"] = _state_name(pij.execution_state)
+    result["match_state"] = _state_name(pij.match_state)
+    result["confidence_level"] = _confidence_name(pij.confidence_level)
+
+
+def _parse_malicious_uris(filter_value, result: Dict[str, Any]) -> None:
+    uri = filter_value.malicious_uri_filter_result
+    if uri:
+        result["execution_state"] = _state_name(uri.execution_state)
+        result["match_state"] = _state_name(uri.match_state)
+
+
+def _parse_csam(filter_value, result: Dict[str, Any]) -> None:
+    csam = filter_value.csam_filter_filter_result
+    if csam:
+        result["execution_state"] = _state_name(csam.execution_state)
+        result["match_state"] = _state_name(csam.match_state)
+
+
+# Model Armor filter key -> parser filling the filter's result dict
+_FILTER_PARSERS = {
+    "rai": _parse_rai,
+    "sdp": _parse_sdp,
+    "pi_and_jailbreak": _parse_pi_and_jailbreak,
+    "malicious_uris": _parse_malicious_uris,
+    "csam": _parse_csam,
+}
+
+
+
 # Model Armor Client Initialization
 class ModelArmorClient:
     """Google Cloud Model Armor API client."""
     
     def __init__(self, key_path: str, project_id: str, location_id: str, template_id: str):
-        if not os.path.exists(key_path):
-            raise FileNotFoundError(f"Service account key not found: {key_path}")
-        
-        credentials = service_account.Credentials.from_service_account_file(key_path)
+        credentials = _load_credentials(key_path)
+        # Default gRPC transport: one persistent HTTP/2 channel, binary protobuf
         self._client = modelarmor_v1.ModelArmorClient(
             credentials=credentials,
-            transport="rest",
-            client_options=ClientOptions(api_endpoint=f"modelarmor.{location_id}.rep.googleapis.com")
+            client_options=ClientOptions(api_endpoint=f"modelarmor.{location_id}.rep.googleapis.com:443")
         )
         self._template_path = f"projects/{project_id}/locations/{location_id}/templates/{template_id}"
+        
+        # Raw protobuf request prototypes: copying one and setting the text is several times
+        # cheaper than building nested proto-plus messages on every call
+        self._user_prompt_pb = modelarmor_v1.SanitizeUserPromptRequest.pb(
+            modelarmor_v1.SanitizeUserPromptRequest(name=self._template_path)
+        )
+        self._model_response_pb = modelarmor_v1.SanitizeModelResponseRequest.pb(
+            modelarmor_v1.SanitizeModelResponseRequest(name=self._template_path)
+        )
     
 
     def _parse_response(self, response, check_type: str) -> Dict[str, Any]:
         """Parse Model Armor response."""
         sanitization = response.sanitization_result
-        overall_match = str(sanitization.filter_match_state.name) if sanitization.filter_match_state else "UNKNOWN"
+        overall_match = _state_name(sanitization.filter_match_state)
         
         filter_results = {}
         blocked_filters = []
@@ -59,48 +146,19 @@ class ModelArmorClient:
     def _parse_filter(self, filter_key: str, filter_value) -> Dict[str, Any]:
         """Parse a single filter result."""
         result = {"filter_type": filter_key, "execution_state": "UNKNOWN", "match_state": "UNKNOWN"}
-        
-        if filter_key == "rai" and filter_value.rai_filter_result:
-            rai = filter_value.rai_filter_result
-            result["execution_state"] = str(rai.execution_state.name) if rai.execution_state else "UNKNOWN"
-            result["match_state"] = str(rai.match_state.name) if rai.match_state else "UNKNOWN"
-            result["categories"] = {
-                cat_name: {
-                    "match_state": str(cat_result.match_state.name) if cat_result.match_state else "UNKNOWN",
-                    "confidence_level": str(cat_result.confidence_level.name) 
-                        if cat_result.confidence_level and cat_result.confidence_level.name != "CONFIDENCE_LEVEL_UNSPECIFIED" else None
-                }
-                for cat_name, cat_result in rai.rai_filter_type_results.items()
-            }
-        elif filter_key == "sdp" and filter_value.sdp_filter_result:
-            sdp = filter_value.sdp_filter_result
-            if sdp.inspect_result:
-                result["execution_state"] = str(sdp.inspect_result.execution_state.name) if sdp.inspect_result.execution_state else "UNKNOWN"
-                result["match_state"] = str(sdp.inspect_result.match_state.name) if sdp.inspect_result.match_state else "UNKNOWN"
-        elif filter_key == "pi_and_jailbreak" and filter_value.pi_and_jailbreak_filter_result:
-            pij = filter_value.pi_and_jailbreak_filter_result
-            result["execution_state"] = str(pij.execution_state.name) if pij.execution_state else "UNKNOWN"
-            result["match_state"] = str(pij.match_state.name) if pij.match_state else "UNKNOWN"
-            result["confidence_level"] = str(pij.confidence_level.name) if pij.confidence_level and pij.confidence_level.name != "CONFIDENCE_LEVEL_UNSPECIFIED" else None
-        elif filter_key == "malicious_uris" and filter_value.malicious_uri_filter_result:
-            uri = filter_value.malicious_uri_filter_result
-            result["execution_state"] = str(uri.execution_state.name) if uri.execution_state else "UNKNOWN"
-            result["match_state"] = str(uri.match_state.name) if uri.match_state else "UNKNOWN"
-        elif filter_key == "csam" and filter_value.csam_filter_filter_result:
-            csam = filter_value.csam_filter_filter_result
-            result["execution_state"] = str(csam.execution_state.name) if csam.execution_state else "UNKNOWN"
-            result["match_state"] = str(csam.match_state.name) if csam.match_state else "UNKNOWN"
-        
+        parser = _FILTER_PARSERS.get(filter_key)
+        if parser is not None:
+            parser(filter_value, result)
         return result
     
 
 
     def sanitize_user_prompt(self, text: str) -> Dict[str, Any]:
         """Sanitize user prompt."""
-        request = modelarmor_v1.SanitizeUserPromptRequest(
-            name=self._template_path,
-            user_prompt_data=modelarmor_v1.DataItem(text=text)
-        )
+        pb = type(self._user_prompt_pb)()
+        pb.CopyFrom(self._user_prompt_pb)
+        pb.user_prompt_data.text = text
+        request = modelarmor_v1.SanitizeUserPromptRequest.wrap(pb)
         response = self._client.sanitize_user_prompt(request=request)
         return self._parse_response(response, CheckType.USER_PROMPT.value)
     
@@ -108,10 +166,10 @@ class ModelArmorClient:
 
     def sanitize_model_response(self, text: str) -> Dict[str, Any]:
         """Sanitize model response."""
-        request = modelarmor_v1.SanitizeModelResponseRequest(
-            name=self._template_path,
-            model_response_data=modelarmor_v1.DataItem(text=text)
-        )
+        pb = type(self._model_response_pb)()
+        pb.CopyFrom(self._model_response_pb)
+        pb.model_response_data.text = text
+        request = modelarmor_v1.SanitizeModelResponseRequest.wrap(pb)
         response = self._client.sanitize_model_response(request=request)
         return self._parse_response(response, CheckType.MODEL_RESPONSE.value)
 
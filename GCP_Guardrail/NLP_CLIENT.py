@@ -1,11 +1,189 @@
 from google.oauth2 import service_account
 from google.cloud import language_v1
-from typing import Dict, Any, Optional, List, Union
+from google.cloud.language_v1.services.language_service.transports import LanguageServiceGrpcTransport
+from google.api_core import exceptions as google_exceptions
+from google.api_core import retry as retries
+from typing import Dict, Any, Optional, List, Union, Callable
 from ENUM_CLASSES import (
     ModerationCategory, EntityType,
     parse_entity_types, parse_moderation_categories, parse_moderation_thresholds
 )
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+from types import SimpleNamespace
 import os
+import re
+import threading
+
+
+# One LanguageServiceClient (and gRPC channel) per key file, shared by every NLPClient
+_CLIENT_CACHE: Dict[str, language_v1.LanguageServiceClient] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# gRPC channel options: the transport's own unlimited message sizes, plus HTTP/2 keepalive pings
+# so the shared connection is kept warm and a dead one is noticed before the next request
+_CHANNEL_OPTIONS = [
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Per-attempt deadline and retry policy for every NLP call. The client default lets a stuck call
+# hang for up to 10 minutes; here a slow attempt is cut off and retried with fast backoff instead.
+# The deadline grows with the payload so a large chunk isn't cut off while legitimately working,
+# and only small requests - where a timeout means a stuck call, not a slow one - retry on it.
+RPC_TIMEOUT_SECONDS = 10.0
+RPC_TIMEOUT_SECONDS_PER_KB = 0.25
+RPC_RETRY_BUDGET_SECONDS = 30.0
+RPC_RETRY_TIMEOUTS_MAX_BYTES = 8_000
+_RETRY_BACKOFF = {"initial": 0.05, "maximum": 1.0, "multiplier": 2.0}
+# deadline= rather than timeout= keeps older google-api-core releases working
+_RETRY_SMALL = retries.Retry(
+    predicate=retries.if_exception_type(google_exceptions.DeadlineExceeded, google_exceptions.ServiceUnavailable),
+    deadline=RPC_RETRY_BUDGET_SECONDS, **_RETRY_BACKOFF
+)
+_RETRY_UNAVAILABLE = retries.if_exception_type(google_exceptions.ServiceUnavailable)
+
+
+def _call_options(text: str) -> Dict[str, Any]:
+    """retry/timeout keyword arguments for one NLP request carrying text."""
+    size = len(text.encode("utf-8"))
+    if size <= RPC_RETRY_TIMEOUTS_MAX_BYTES:
+        return {"retry": _RETRY_SMALL, "timeout": RPC_TIMEOUT_SECONDS}
+    timeout = RPC_TIMEOUT_SECONDS + RPC_TIMEOUT_SECONDS_PER_KB * size / 1000
+    retry = retries.Retry(predicate=_RETRY_UNAVAILABLE, deadline=timeout + RPC_RETRY_BUDGET_SECONDS, **_RETRY_BACKOFF)
+    return {"retry": retry, "timeout": timeout}
+
+
+# Default blocked sets (everything) - API names are matched against enum values
+_ALL_ENTITY_VALUES = frozenset(et.value for et in EntityType)
+_ALL_MODERATION_VALUES = frozenset(cat.value for cat in ModerationCategory)
+
+# Severity bands: confidence >= bound moves up one label
+_SEVERITY_BOUNDS = (0.3, 0.5, 0.8)
+_SEVERITY_LABELS = ("NEGLIGIBLE", "LOW", "MEDIUM", "HIGH")
+
+
+# Texts above this many UTF-8 bytes are split at sentence boundaries and sent as parallel requests;
+# latency grows faster than linearly with document size and the API rejects very large documents
+CHUNK_MAX_BYTES = 80_000
+_CHUNK_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nlp-chunk")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+def _chunk_text(text: str, max_bytes: int = CHUNK_MAX_BYTES) -> List[str]:
+    """Split text into pieces of at most max_bytes UTF-8 bytes, greedily packing whole sentences."""
+    # A UTF-8 character is at most 4 bytes, so short texts skip the encode
+    if len(text) <= max_bytes // 4 or len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+    
+    chunks = []
+    current: List[str] = []
+    size = 0
+    for sentence in _SENTENCE_BREAK.split(text):
+        sentence_bytes = len(sentence.encode("utf-8")) + 1
+        if current and size + sentence_bytes > max_bytes:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        if sentence_bytes > max_bytes:
+            # No sentence break to use: cut by characters, which can never exceed max_bytes
+            step = max_bytes // 4
+            chunks.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+            continue
+        current.append(sentence)
+        size += sentence_bytes
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _max_confidence_by_name(groups) -> list:
+    """Keep the highest-confidence item per category name across chunk responses."""
+    best = {}
+    for group in groups:
+        for item in group:
+            current = best.get(item.name)
+            if current is None or item.confidence > current.confidence:
+                best[item.name] = item
+    return list(best.values())
+
+
+def _merge_responses(responses: list, sentiment: bool = False, entities: bool = False,
+                     classify: bool = False, moderate: bool = False) -> SimpleNamespace:
+    """Combine per-chunk responses into one object the _parse_* helpers accept."""
+    merged = SimpleNamespace()
+    if sentiment:
+        doc_sentiments = [r.document_sentiment for r in responses]
+        magnitude = sum(s.magnitude for s in doc_sentiments)
+        # Score weighted by magnitude so emotional chunks count for more; magnitude is a total, so it adds up
+        if magnitude:
+            score = sum(s.score * s.magnitude for s in doc_sentiments) / magnitude
+        else:
+            score = sum(s.score for s in doc_sentiments) / len(doc_sentiments)
+        merged.document_sentiment = SimpleNamespace(score=score, magnitude=magnitude)
+        merged.sentences = [s for r in responses for s in r.sentences]
+    if entities:
+        merged.entities = [e for r in responses for e in r.entities]
+    if classify:
+        merged.categories = _max_confidence_by_name(r.categories for r in responses)
+    if moderate:
+        merged.moderation_categories = _max_confidence_by_name(r.moderation_categories for r in responses)
+    return merged
+
+
+# ASCII letters/digits - ASCII text without any has nothing for the moderation model to flag
+_ALNUM_ASCII = re.compile(r"[A-Za-z0-9]")
+
+
+def _nothing_to_moderate(text: str) -> bool:
+    """True for pure ASCII punctuation/symbols/whitespace, which moderate_text answers without an RPC."""
+    return text.isascii() and _ALNUM_ASCII.search(text) is None
+
+
+def _trivial_moderation() -> Dict[str, Any]:
+    # trivially_passed marks that no moderation request was made, so results stay auditable
+    return {"moderation": [], "blocked": [], "trivially_passed": True}
+
+
+# Entity type number -> name, e.g. 1 -> "PERSON"
+_ENTITY_TYPE_NAMES: Dict[int, str] = {t.value: t.name for t in language_v1.Entity.Type}
+
+
+def _raw_pb(response):
+    """The protobuf message under a proto-plus response; reading fields there skips the per-access
+    wrapper layer. Anything else (e.g. merged chunk responses) is returned as-is."""
+    to_pb = getattr(type(response), "pb", None)
+    return to_pb(response) if to_pb is not None else response
+
+
+# classifyText needs at least this many words
+CLASSIFY_MIN_WORDS = 20
+_WORD = re.compile(r"\S+")
+
+
+def _has_min_words(text: str, count: int = CLASSIFY_MIN_WORDS) -> bool:
+    """Same as len(text.split()) >= count, but stops scanning at the count-th word."""
+    return next(islice(_WORD.finditer(text), count - 1, None), None) is not None
+
+
+@lru_cache(maxsize=8)
+def _load_credentials(key_path: str) -> service_account.Credentials:
+    """Parse a service account key once per path; the credentials object refreshes its own tokens."""
+    if not os.path.exists(key_path):
+        raise FileNotFoundError(f"Service account key not found: {key_path}")
+    return service_account.Credentials.from_service_account_file(key_path)
+
+
+@lru_cache(maxsize=128)
+def category_matcher(patterns: tuple) -> tuple:
+    """(lowercased patterns, one alternation over all of them) for a blocked-category list.
+    Shared with the runner's config normalization so both match categories the same way."""
+    lowered = tuple(p.lower() for p in patterns)
+    return lowered, re.compile("|".join(map(re.escape, lowered)))
 
 
 # Google Cloud NLP API Client
@@ -13,25 +191,41 @@ class NLPClient:
     """Google Cloud Natural Language API client."""
     
     def __init__(self, key_path: str):
-        if not os.path.exists(key_path):
-            raise FileNotFoundError(f"Service account key not found: {key_path}")
-        credentials = service_account.Credentials.from_service_account_file(key_path)
-        self._client = language_v1.LanguageServiceClient(credentials=credentials)
+        with _CLIENT_CACHE_LOCK:
+            client = _CLIENT_CACHE.get(key_path)
+            if client is None:
+                credentials = _load_credentials(key_path)
+                channel = LanguageServiceGrpcTransport.create_channel(credentials=credentials, options=_CHANNEL_OPTIONS)
+                client = _CLIENT_CACHE[key_path] = language_v1.LanguageServiceClient(
+                    transport=LanguageServiceGrpcTransport(channel=channel)
+                )
+        self._client = client
     
     def _create_document(self, text: str) -> language_v1.Document:
         return language_v1.Document(content=text, type_=language_v1.Document.Type.PLAIN_TEXT)
     
     def _get_severity(self, confidence: float) -> str:
-        if confidence >= 0.8: return "HIGH"
-        elif confidence >= 0.5: return "MEDIUM"
-        elif confidence >= 0.3: return "LOW"
-        return "NEGLIGIBLE"
+        return _SEVERITY_LABELS[bisect_right(_SEVERITY_BOUNDS, confidence)]
+    
+    def _request(self, send: Callable[[str], Any], text: str, merge: Callable[[list], Any]):
+        """send(text), or send() per chunk in parallel and merge() the responses for long texts."""
+        chunks = _chunk_text(text)
+        if len(chunks) == 1:
+            return send(text)
+        return merge(list(_CHUNK_EXECUTOR.map(send, chunks)))
     
 
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze text sentiment."""
-        doc = self._create_document(text)
-        response = self._client.analyze_sentiment(document=doc)
+        response = self._request(
+            lambda t: self._client.analyze_sentiment(document=self._create_document(t), **_call_options(t)),
+            text, partial(_merge_responses, sentiment=True)
+        )
+        return self._parse_sentiment(response)
+    
+    def _parse_sentiment(self, response) -> Dict[str, Any]:
+        """Build the sentiment result from an analyze_sentiment or annotate_text response."""
+        response = _raw_pb(response)
         sentiment = response.document_sentiment
         
         # Interpret sentiment
@@ -63,18 +257,23 @@ class NLPClient:
             blocked_types: Entity types to block. Can be strings like "person", "location" 
                           or EntityType enums. Case-insensitive.
         """
-        doc = self._create_document(text)
-        response = self._client.analyze_entities(document=doc)
-        
+        response = self._request(
+            lambda t: self._client.analyze_entities(document=self._create_document(t), **_call_options(t)),
+            text, partial(_merge_responses, entities=True)
+        )
+        return self._parse_entities(response, blocked_types)
+    
+    def _parse_entities(self, response, blocked_types: Optional[List[Union[str, EntityType]]] = None) -> Dict[str, Any]:
+        """Build the entities result from an analyze_entities or annotate_text response."""
         # Convert string inputs to EntityType enums
         parsed_blocked = parse_entity_types(blocked_types)
-        blocked_type_values = [et.value for et in (parsed_blocked or list(EntityType))]
+        blocked_type_values = frozenset(et.value for et in parsed_blocked) if parsed_blocked else _ALL_ENTITY_VALUES
         
         entities = []
         blocked = []
         
-        for entity in response.entities:
-            entity_type = language_v1.Entity.Type(entity.type_).name
+        for entity in _raw_pb(response).entities:
+            entity_type = _ENTITY_TYPE_NAMES.get(entity.type_, "UNKNOWN")
             entity_data = {
                 "name": entity.name,
                 "type": entity_type,
@@ -98,22 +297,33 @@ class NLPClient:
     def classify_text(self, text: str, blocked_categories: Optional[List[str]] = None, 
                       threshold: float = 0.5) -> Dict[str, Any]:
         """Classify text into categories. Requires 20+ words."""
-        if len(text.split()) < 20:
+        if not _has_min_words(text):
             return {"error": "Text too short for classification (min 20 words)", "categories": [], "blocked": []}
         
         doc = self._create_document(text)
-        response = self._client.classify_text(document=doc)
-        
+        response = self._client.classify_text(document=doc, **_call_options(text))
+        return self._parse_classification(response, blocked_categories, threshold)
+    
+    def _parse_classification(self, response, blocked_categories: Optional[List[str]] = None,
+                              threshold: float = 0.5) -> Dict[str, Any]:
+        """Build the classification result from a classify_text or annotate_text response."""
         categories = []
         blocked = []
         
-        for cat in response.categories:
+        if blocked_categories:
+            lowered, matcher = category_matcher(tuple(blocked_categories))
+        
+        for cat in _raw_pb(response).categories:
             cat_data = {"category": cat.name, "confidence": round(cat.confidence, 4)}
             categories.append(cat_data)
             
             if blocked_categories and cat.confidence >= threshold:
-                for pattern in blocked_categories:
-                    if pattern.lower() in cat.name.lower():
+                name_lower = cat.name.lower()
+                # Single scan rejects the common no-match case; the loop keeps first-listed-pattern reporting
+                if not matcher.search(name_lower):
+                    continue
+                for pattern, pattern_lower in zip(blocked_categories, lowered):
+                    if pattern_lower in name_lower:
                         blocked.append({
                             "category": cat.name,
                             "matched_pattern": pattern,
@@ -139,17 +349,28 @@ class NLPClient:
             thresholds: Per-category confidence thresholds (default: 0.5 for all).
                        Keys can be strings like "toxic" or ModerationCategory enums.
         """
-        doc = self._create_document(text)
-        response = self._client.moderate_text(document=doc)
+        if _nothing_to_moderate(text):
+            return _trivial_moderation()
         
+        response = self._request(
+            lambda t: self._client.moderate_text(document=self._create_document(t), **_call_options(t)),
+            text, partial(_merge_responses, moderate=True)
+        )
+        return self._parse_moderation(response, blocked_categories, thresholds)
+    
+    def _parse_moderation(self, response,
+                          blocked_categories: Optional[List[Union[str, ModerationCategory]]] = None,
+                          thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None) -> Dict[str, Any]:
+        """Build the moderation result from a moderate_text or annotate_text response."""
         # Convert string inputs to ModerationCategory enums
         parsed_blocked = parse_moderation_categories(blocked_categories)
         parsed_thresholds = parse_moderation_thresholds(thresholds)
         
         # Default: block all categories
         if parsed_blocked is None:
-            parsed_blocked = list(ModerationCategory)
-        blocked_values = [cat.value for cat in parsed_blocked]
+            blocked_values = _ALL_MODERATION_VALUES
+        else:
+            blocked_values = frozenset(cat.value for cat in parsed_blocked)
         
         # Default threshold
         default_threshold = 0.5
@@ -157,7 +378,7 @@ class NLPClient:
         moderation_results = []
         blocked = []
         
-        for mod_cat in response.moderation_categories:
+        for mod_cat in _raw_pb(response).moderation_categories:
             severity = self._get_severity(mod_cat.confidence)
             moderation_results.append({
                 "category": mod_cat.name,
@@ -167,7 +388,7 @@ class NLPClient:
             
             if mod_cat.name in blocked_values:
                 # Get threshold for this category
-                cat_enum = next((c for c in ModerationCategory if c.value == mod_cat.name), None)
+                cat_enum = ModerationCategory._value2member_map_.get(mod_cat.name)
                 threshold = (parsed_thresholds or {}).get(cat_enum, default_threshold)
                 
                 if mod_cat.confidence >= threshold:
@@ -180,3 +401,55 @@ class NLPClient:
         
         return {"moderation": moderation_results, "blocked": blocked}
 
+
+    
+    def annotate_text(self, text: str, sentiment: bool = False, entities: bool = False,
+                      classify: bool = False, moderate: bool = False,
+                      blocked_types: Optional[List[Union[str, EntityType]]] = None,
+                      blocked_categories: Optional[List[str]] = None, threshold: float = 0.5,
+                      blocked_moderation_categories: Optional[List[Union[str, ModerationCategory]]] = None,
+                      moderation_thresholds: Optional[Dict[Union[str, ModerationCategory], float]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run several analyses in a single annotateText RPC.
+        
+        Returns a dict with a "sentiment", "entities", "classify" and/or "moderate" key
+        (one per requested feature), each shaped like the matching single-feature method.
+        """
+        results = {}
+        
+        # Same 20-word minimum as classify_text; a short text would fail the whole request
+        if classify and not _has_min_words(text):
+            results["classify"] = {"error": "Text too short for classification (min 20 words)", "categories": [], "blocked": []}
+            classify = False
+        
+        if moderate and _nothing_to_moderate(text):
+            results["moderate"] = _trivial_moderation()
+            moderate = False
+        
+        if not (sentiment or entities or classify or moderate):
+            return results
+        
+        def send(chunk: str):
+            features = language_v1.AnnotateTextRequest.Features(
+                extract_document_sentiment=sentiment,
+                extract_entities=entities,
+                # A short trailing chunk of a long text is left out of classification
+                classify_text=classify and (chunk is text or _has_min_words(chunk)),
+                moderate_text=moderate
+            )
+            return self._client.annotate_text(document=self._create_document(chunk), features=features, **_call_options(chunk))
+        
+        response = self._request(send, text, partial(
+            _merge_responses, sentiment=sentiment, entities=entities, classify=classify, moderate=moderate
+        ))
+        
+        if sentiment:
+            results["sentiment"] = self._parse_sentiment(response)
+        if entities:
+            results["entities"] = self._parse_entities(response, blocked_types)
+        if classify:
+            results["classify"] = self._parse_classification(response, blocked_categories, threshold)
+        if moderate:
+            results["moderate"] = self._parse_moderation(response, blocked_moderation_categories, moderation_thresholds)
+        
+        return results
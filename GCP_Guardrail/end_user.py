@@ -1,7 +1,14 @@
 from GCP_Guardrail_Runner import GuardrailRunner
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
 
+# Optional: orjson writes the result files much faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def check_configs(config_path: str, input_text: str, generated_text: Optional[str] = None, 
                   user_name: str = "simpplr", enable_logging: bool = False):
@@ -15,239 +22,67 @@ def check_configs(config_path: str, input_text: str, generated_text: Optional[st
         user_name: User name for logging
         enable_logging: Whether to enable logging
     """
-    runner = GuardrailRunner(config_path=config_path, user_name=user_name, enable_logging=enable_logging)
-    print("\nGuardrail initialized successfully!")
-    print(f"  Log file: {runner.get_log_file_path()}")
-    result = runner.run(input_text, generated_text=generated_text)
-    print("Result:")
-   
+    # Closed on exit so its thread pools and log writer don't outlive the check
+    with GuardrailRunner(config_path=config_path, user_name=user_name, enable_logging=enable_logging) as runner:
+        lines = ["\nGuardrail initialized successfully!", f"  Log file: {runner.get_log_file_path()}"]
+        result = runner.run(input_text, generated_text=generated_text, include_text=True)
+    lines.append(f"Result ({config_path}):")
+    
     if result.get("summary", {}).get("passed"):
-        print("\nAll checks PASSED")
+        lines.append("\nAll checks PASSED")
     else:
-        print("\nSome checks FAILED")
+        lines.append("\nSome checks FAILED")
+    # One print per check, so concurrent checks don't interleave their output
+    print("\n".join(lines))
     return result
 
 
-"""
-# Check for config type 1
-config_path = "test_config_folder/config_type_1.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_1.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-# Check for config type 2
-config_path = "test_config_folder/config_type_2.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_2.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-
-# Check for config type 3
-config_path = "test_config_folder/config_type_3.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_3.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-# Check for config type 4
-config_path = "test_config_folder/config_type_4.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_4.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-# Check for config type 5
-config_path = "test_config_folder/config_type_5.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_5.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-# Check for config type 6
-config_path = "test_config_folder/config_type_6.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_6.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-# Check for config type 7
-config_path = "test_config_folder/config_type_7.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_7.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 8
-config_path = "test_config_folder/config_type_8.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_8.json", "w") as f:
-    json.dump(result1, f, indent=2)
+DEFAULT_INPUT_TEXT = "Hello, I am not happy as I killed someone."
+
+# (config type, input text, generated text) - configs 22-25 and 27 have an output phase,
+# 26 is input only (USER_PROMPT) and 27 output only (MODEL_RESPONSE)
+TEST_CASES: List[Tuple[int, str, Optional[str]]] = [
+    *[(config_type, DEFAULT_INPUT_TEXT, None) for config_type in range(1, 22)],
+    (22, DEFAULT_INPUT_TEXT, "I understand you're feeling upset. Violence is never the answer. Please consider seeking help from a mental health professional."),
+    (23, DEFAULT_INPUT_TEXT, "I'm sorry to hear that. It sounds like you're going through a difficult time. Please reach out to local authorities or a counselor."),
+    (24, DEFAULT_INPUT_TEXT, "This is a serious matter. I recommend contacting emergency services or a legal professional immediately."),
+    (25, DEFAULT_INPUT_TEXT, "Go to hell."),
+    (26, DEFAULT_INPUT_TEXT, None),
+    (27, "Tell me a joke", "Here's a joke: Why did the programmer quit his job? Because he didn't get arrays! Call me at 555-123-4567 for more jokes."),
+]
+
+
+def run_test_case(config_type: int, input_text: str, generated_text: Optional[str] = None,
+                  enable_logging: bool = False) -> Dict[str, Any]:
+    """Check one test config and save its result to test_config_results/."""
+    result = check_configs(f"test_config_folder/config_type_{config_type}.json", input_text,
+                           generated_text=generated_text, enable_logging=enable_logging)
+    result_path = f"test_config_results/result_type_{config_type}.json"
+    if orjson is not None:
+        with open(result_path, "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        with open(result_path, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
 
 
-# Check for config type 9
-config_path = "test_config_folder/config_type_9.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_9.json", "w") as f:
-    json.dump(result1, f, indent=2)
+def run_test_cases(cases: List[Tuple[int, str, Optional[str]]], max_workers: int = 1,
+                   enable_logging: bool = False) -> List[Dict[str, Any]]:
+    """
+    Run several test cases, one after another by default. Each case has its own runner
+    (three thread pools and a log writer), so max_workers > 1 starts that many at once.
+    """
+    if max_workers <= 1:
+        return [run_test_case(*case, enable_logging=enable_logging) for case in cases]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_test_case, *case, enable_logging=enable_logging) for case in cases]
+        return [future.result() for future in futures]
 
 
-# Check for config type 10
-config_path = "test_config_folder/config_type_10.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_10.json", "w") as f:
-    json.dump(result1, f, indent=2)
+if __name__ == "__main__":
+    # Check every config type:
+    # run_test_cases(TEST_CASES)
     
-
-# Check for config type 11
-config_path = "test_config_folder/config_type_11.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_11.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 12
-config_path = "test_config_folder/config_type_12.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_12.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 13
-config_path = "test_config_folder/config_type_13.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_13.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 14
-config_path = "test_config_folder/config_type_14.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_14.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 15
-config_path = "test_config_folder/config_type_15.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_15.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 16
-config_path = "test_config_folder/config_type_16.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_16.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-
-# Check for config type 17
-config_path = "test_config_folder/config_type_17.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_17.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 18
-config_path = "test_config_folder/config_type_18.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_18.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 19
-config_path = "test_config_folder/config_type_19.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_19.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-# Check for config type 20
-config_path = "test_config_folder/config_type_20.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_20.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-# Check for config type 21
-config_path = "test_config_folder/config_type_21.json"
-test_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, test_text)
-with open("test_config_results/result_type_21.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-
-# Check for config type 22 (has output phase - need generated_text)
-config_path = "test_config_folder/config_type_22.json"
-input_text = "Hello, I am not happy as I killed someone."
-generated_text = "I understand you're feeling upset. Violence is never the answer. Please consider seeking help from a mental health professional."
-result1 = check_configs(config_path, input_text, generated_text=generated_text)
-with open("test_config_results/result_type_22.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-# Check for config type 23 (has output phase - need generated_text)
-config_path = "test_config_folder/config_type_23.json"
-input_text = "Hello, I am not happy as I killed someone."
-generated_text = "I'm sorry to hear that. It sounds like you're going through a difficult time. Please reach out to local authorities or a counselor."
-result1 = check_configs(config_path, input_text, generated_text=generated_text)
-with open("test_config_results/result_type_23.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-# Check for config type 24 (has output phase - need generated_text)
-config_path = "test_config_folder/config_type_24.json"
-input_text = "Hello, I am not happy as I killed someone."
-generated_text = "This is a serious matter. I recommend contacting emergency services or a legal professional immediately."
-result1 = check_configs(config_path, input_text, generated_text=generated_text)
-with open("test_config_results/result_type_24.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-# Check for config type 25 (has output phase - need generated_text)
-config_path = "test_config_folder/config_type_25.json"
-input_text = "Hello, I am not happy as I killed someone."
-generated_text = "Go to hell."
-result1 = check_configs(config_path, input_text, generated_text=generated_text)
-with open("test_config_results/result_type_25.json", "w") as f:
-    json.dump(result1, f, indent=2)
-
-# Check for config type 26 (input only - USER_PROMPT)
-config_path = "test_config_folder/config_type_26.json"
-input_text = "Hello, I am not happy as I killed someone."
-result1 = check_configs(config_path, input_text)
-with open("test_config_results/result_type_26.json", "w") as f:
-    json.dump(result1, f, indent=2)
-"""
-
-
-# Check for config type 27 (output only - MODEL_RESPONSE, need generated_text)
-config_path = "test_config_folder/config_type_27.json"
-input_text = "Tell me a joke"
-generated_text = "Here's a joke: Why did the programmer quit his job? Because he didn't get arrays! Call me at 555-123-4567 for more jokes."
-result1 = check_configs(config_path, input_text, generated_text=generated_text, enable_logging=True)
-with open("test_config_results/result_type_27.json", "w") as f:
-    json.dump(result1, f, indent=2)
\ No newline at end of file
+    # Check for config type 27 (output only - MODEL_RESPONSE, need generated_text)
+    run_test_case(*TEST_CASES[-1], enable_logging=True)
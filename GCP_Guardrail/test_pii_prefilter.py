@@ -0,0 +1,35 @@
+import re
+
+import pytest
+
+runner = pytest.importorskip("GCP_Guardrail_Runner")
+
+
+# Every ASCII character Python's re treats as \s - RE2 and Hyperscan each lack some of them
+SEPARATORS = [" ", "\t", "\n", "\x0b", "\f", "\r", "\x1c", "\x1d", "\x1e", "\x1f"]
+
+
+@pytest.mark.parametrize("separator", SEPARATORS)
+def test_prefilter_keeps_phone_number_pattern(separator):
+    text = f"call 555{separator}123{separator}4567 now"
+    assert runner.COMPILED_PII_PATTERNS["PHONE_NUMBER"][0].search(text)
+    hits = runner._pii_pattern_hits(text)
+    assert hits is None or ("PHONE_NUMBER", 0) in hits
+
+
+@pytest.mark.parametrize("separator", SEPARATORS)
+def test_phone_number_with_separator_is_blocked(separator):
+    text = f"call 555{separator}123{separator}4567 now"
+    phase_config = runner.normalize_phase_config({"analyze_entities_blocked_types": ["PHONE_NUMBER"]})
+    blocked = runner.GuardrailRunner._check_pii_with_regex(text, phase_config)
+    assert [item["entity_name"] for item in blocked] == [f"555{separator}123{separator}4567"]
+
+
+@pytest.mark.parametrize("pattern", [p for patterns in runner.PII_PATTERNS.values() for p in patterns])
+def test_prefilter_pattern_matches_like_re(pattern):
+    spelled_out = re.compile(runner._prefilter_pattern(pattern), re.IGNORECASE)
+    original = re.compile(pattern, re.IGNORECASE)
+    for code in range(128):
+        char = chr(code)
+        text = f"(555){char}123{char}4567 123{char}45{char}6789 1234{char}5678{char}9012{char}3456"
+        assert bool(spelled_out.search(text)) == bool(original.search(text))